@@ -1,32 +1,191 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, g, request, jsonify
 from flask_cors import CORS
 import os
+import tempfile
+import time
 from werkzeug.utils import secure_filename
-from models.simple_storage import SimpleStorage
+from models.storage import open_storage
+from models.query import SUMMARY_PROJECTION, apply_projection, iter_analyses, parse_fields
+from models.search_index import attach_search_index
+from models.match_index import attach_match_index
+from models.duplicate_index import attach_duplicate_index
+from models.aggregates import REBUILD_PROJECTION, attach_aggregates
 from utils.parsers import ResumeParser
 from services.analyzer import ProfileAnalyzer
+from services.pipeline import allowed_file, analyze_document, pipeline_version
+from services.result_cache import ResultCache
+from services.extraction_pool import ExtractionError, ExtractionPool
+from services import batch
+from services.jobs import JobQueue, QueueFull
+from services.metrics import StageTimer, metrics
+from services.export import FORMATS, export_analyses
 from utils.linkedin_advanced import AdvancedLinkedInAnalyzer
 
-app = Flask(__name__)
-CORS(app)
+JOB_FOLDER = 'jobs'
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_BATCH_URLS = 100
+# Uploads up to this size stay in memory; larger ones spill to a temp file once
+UPLOAD_SPOOL_BYTES = int(os.getenv('UPLOAD_SPOOL_BYTES', str(2 * 1024 * 1024)))
+# Load the indexes in background threads at startup rather than on first use
+INDEX_WARMUP = os.getenv('INDEX_WARMUP', '1').lower() in ('1', 'true', 'yes')
 
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+class SpooledRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='rb+')
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app = Flask(__name__)
+app.request_class = SpooledRequest
+CORS(app)
 
-db = SimpleStorage()
+db = open_storage()
+# The indexes load after startup; requests that use one wait for its load
+search_index = attach_search_index(db, lazy=True)
+match_index = attach_match_index(db, lazy=True)
+duplicate_index = attach_duplicate_index(db, lazy=True)
+aggregates = attach_aggregates(db, lazy=True)
+if INDEX_WARMUP:
+    for index in (search_index, match_index, duplicate_index, aggregates):
+        index.load_in_background()
 parser = ResumeParser()
 analyzer = ProfileAnalyzer()
 linkedin_analyzer = AdvancedLinkedInAnalyzer()
+result_cache = ResultCache(
+    max_entries=int(os.getenv('RESULT_CACHE_SIZE', '512')),
+    disk_dir=os.getenv('RESULT_CACHE_DIR', 'result_cache') or None
+)
+# Uploads are extracted in worker processes with time and memory limits;
+# EXTRACT_ISOLATION=0 extracts them in the request thread instead
+extraction_pool = ExtractionPool(
+    workers=int(os.getenv('EXTRACT_WORKERS', str(batch.worker_count()))),
+    timeout=float(os.getenv('EXTRACT_TIMEOUT', '20')),
+    max_rss=int(os.getenv('EXTRACT_MAX_RSS_MB', '512')) * 1024 * 1024,
+    max_jobs=int(os.getenv('EXTRACT_MAX_JOBS', '200'))
+) if os.getenv('EXTRACT_ISOLATION', '1').lower() in ('1', 'true', 'yes') else None
+
+def link_duplicate(record):
+    # Links a new record to the candidate of its closest stored near-duplicate
+    # and returns that duplicate, or None
+    db.refresh()
+    duplicates = duplicate_index.find(record['parsed_data'].get('text'))
+    if not duplicates:
+        return None
+    duplicate = duplicates[0]
+    record['candidate_id'] = duplicate['candidate_id']
+    record['duplicate_of'] = {'_id': duplicate['_id'], 'similarity': duplicate['similarity']}
+    return duplicate
+
+def process_upload(source, filename, dedupe=False, timer=None):
+    # source is the upload stream or, for queued jobs, the stored payload path.
+    # Extract, parse and score, unless this exact file was seen before. With
+    # dedupe, a near-duplicate of a stored resume is not saved again and the
+    # stored analysis is returned instead. Stage durations go to timer and to
+    # the metrics.
+    timer = timer or StageTimer()
+    try:
+        with timer.stage('cache'):
+            cache_key = ResultCache.key_for_file(source, pipeline_version(parser, analyzer))
+            cached = result_cache.get(cache_key)
+        if cached:
+            parsed_data, analysis = cached
+        else:
+            parsed_data, analysis = analyze_document(parser, analyzer, source, filename, timer=timer, extractor=extraction_pool)
+            with timer.stage('cache'):
+                result_cache.put(cache_key, parsed_data, analysis)
+
+        # Save to database
+        result = {
+            'parsed_data': parsed_data,
+            'analysis': analysis,
+            'filename': filename
+        }
+        with timer.stage('dedupe'):
+            duplicate = link_duplicate(result)
+        if duplicate and dedupe:
+            existing = db.get_analysis(duplicate['_id'])
+            if existing:
+                existing['duplicate'] = True
+                existing['similarity'] = duplicate['similarity']
+                return existing
+
+        with timer.stage('store'):
+            db_result = db.save_analysis(result)
+        result['_id'] = db_result.inserted_id
+        return result
+    finally:
+        metrics.observe_stages(timer, 'upload_resume', filename.rsplit('.', 1)[-1].lower())
+
+job_queue = JobQueue(
+    process_upload,
+    job_dir=JOB_FOLDER,
+    workers=int(os.getenv('JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('JOB_QUEUE_SIZE', '100'))
+)
+job_queue.start()
+
+# Server-Timing response headers with the stage durations of each request
+SERVER_TIMING = os.getenv('SERVER_TIMING', '1').lower() in ('1', 'true', 'yes')
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+metrics.add_gauge('resume_storage_records', 'Stored analyses', lambda: {(): db.count_analyses()})
+metrics.add_gauge(
+    'resume_storage_bytes', 'Bytes in storage segments, by live and superseded records',
+    lambda: {(state,): value for state, value in (('live', db.storage_stats().get('live_bytes')), ('dead', db.storage_stats().get('dead_bytes'))) if value is not None},
+    ('state',)
+)
+metrics.add_gauge('resume_job_queue_pending', 'Uploads waiting in the job queue', lambda: {(): job_queue.pending()})
+metrics.add_gauge(
+    'resume_result_cache_events_total', 'Upload result cache events',
+    lambda: {(event,): value for event, value in result_cache.get_stats().items() if not event.endswith('entries')},
+    ('event',), kind='counter'
+)
+metrics.add_gauge(
+    'resume_profile_fetch_events_total', 'LinkedIn profile fetch cache hits and misses, requests and errors',
+    lambda: {(event,): value for event, value in linkedin_analyzer.fetcher.get_stats().items() if event != 'entries'},
+    ('event',), kind='counter'
+)
+metrics.add_gauge(
+    'resume_extraction_events_total', 'Isolated extraction jobs, failures and worker replacements',
+    lambda: {(event,): value for event, value in extraction_pool.get_stats().items() if event != 'idle_workers'} if extraction_pool else {},
+    ('event',), kind='counter'
+)
+metrics.add_gauge(
+    'resume_index_documents', 'Documents in each search index',
+    lambda: {('search',): len(search_index), ('match',): len(match_index), ('duplicate',): len(duplicate_index), ('stats',): len(aggregates)},
+    ('index',)
+)
+metrics.add_gauge(
+    'resume_index_load_seconds', 'Time taken to load each search index after startup',
+    lambda: {(index.name,): index.load_seconds for index in (search_index, match_index, duplicate_index, aggregates) if index.loaded},
+    ('index',)
+)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    metrics.in_flight.inc(endpoint=g.metrics_endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_start
+    metrics.request_seconds.observe(elapsed, endpoint=g.metrics_endpoint, status=response.status_code)
+    timer = g.get('timer')
+    if SERVER_TIMING and timer is not None:
+        timer.add('total', elapsed)
+        response.headers['Server-Timing'] = timer.server_timing()
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exception=None):
+    if 'metrics_endpoint' in g:
+        metrics.in_flight.dec(endpoint=g.metrics_endpoint)
+
+def request_flag(name):
+    return request.values.get(name, '').lower() in ('1', 'true', 'yes')
 
 @app.route('/', methods=['GET'])
 def home():
-    return jsonify({'message': 'Resume Analyzer API is running', 'endpoints': ['/api/upload-resume', '/api/analyze-linkedin-url', '/api/analyses']})
+    return jsonify({'message': 'Resume Analyzer API is running', 'endpoints': ['/api/upload-resume', '/api/upload-resumes', '/api/analyze-linkedin-url', '/api/analyze-linkedin-urls', '/api/analyses', '/api/export', '/api/search', '/api/match', '/api/stats', '/api/metrics']})
 
 @app.route('/api', methods=['GET'])
 def api_info():
@@ -42,47 +201,143 @@ def upload_resume():
         return jsonify({'error': 'Invalid file type'}), 400
     
     filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
-    
+
+    # ?async=1 queues the upload and returns a job id to poll
+    if request_flag('async'):
+        try:
+            job = job_queue.submit(filename, file.stream)
+        except QueueFull as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+        return jsonify({'job_id': job['_id'], 'status': job['status']}), 202
+
+    # Parsed straight from the request stream; no copy under uploads/
+    g.timer = StageTimer()
     try:
-        # Extract text based on file type
-        if filename.endswith('.pdf'):
-            text = parser.extract_text_from_pdf(filepath)
-        else:
-            text = parser.extract_text_from_docx(filepath)
-        
-        # Parse candidate details
-        parsed_data = {
-            'text': text,
-            'email': parser.extract_email(text),
-            'phone': parser.extract_phone(text),
-            'skills': parser.extract_skills(text),
-            'education': parser.extract_education(text),
-            'type': 'resume'
-        }
-        
-        # Analyze and score
-        analysis = analyzer.analyze_resume(parsed_data)
-        
-        # Save to database
-        result = {
-            'parsed_data': parsed_data,
-            'analysis': analysis,
-            'filename': filename
-        }
-        
-        db_result = db.save_analysis(result)
-        result['_id'] = db_result.inserted_id
-        
-        return jsonify(result)
-        
+        return jsonify(process_upload(file.stream, filename, dedupe=request_flag('dedupe'), timer=g.timer))
+    except ExtractionError as e:
+        if e.code == 'busy':
+            return jsonify({'error': str(e), 'code': e.code}), 503, {'Retry-After': '5'}
+        return jsonify({'error': str(e), 'code': e.code}), 422
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        # Clean up uploaded file
-        if os.path.exists(filepath):
-            os.remove(filepath)
+
+@app.route('/api/upload-resumes', methods=['POST'])
+def upload_resumes():
+    # Accepts many files under 'files' (PDF, DOCX or ZIP archives of them);
+    # parsing and scoring fan out over a process pool
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    # The file count and document bytes are checked against the batch limits
+    # before each file or ZIP member is read
+    documents = []
+    batch_bytes = 0
+    try:
+        for file in files:
+            filename = secure_filename(file.filename)
+            if filename.lower().endswith('.zip'):
+                try:
+                    members = batch.read_zip(file.stream, batch.MAX_BATCH_FILES - len(documents), batch.MAX_BATCH_BYTES - batch_bytes)
+                except batch.BatchTooLarge:
+                    raise
+                except Exception as e:
+                    members = [(filename, ValueError(f'Invalid ZIP archive: {e}'))]
+                documents.extend(members)
+                batch_bytes += sum(len(data) for _, data in members if not isinstance(data, Exception))
+            elif allowed_file(filename):
+                file.stream.seek(0, os.SEEK_END)
+                size = file.stream.tell()
+                file.stream.seek(0)
+                if size > batch.MAX_FILE_BYTES:
+                    documents.append((filename, ValueError('File too large')))
+                else:
+                    batch.check_budget(len(documents) + 1, batch_bytes + size, batch.MAX_BATCH_FILES, batch.MAX_BATCH_BYTES)
+                    documents.append((filename, file.read()))
+                    batch_bytes += size
+            else:
+                documents.append((filename, ValueError('Invalid file type')))
+            batch.check_budget(len(documents), batch_bytes, batch.MAX_BATCH_FILES, batch.MAX_BATCH_BYTES)
+    except batch.BatchTooLarge as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Files seen before are answered from the result cache; only the rest
+    # go to the process pool
+    version = pipeline_version(parser, analyzer)
+    results = [None] * len(documents)
+    misses = []
+    for index, (filename, data) in enumerate(documents):
+        if isinstance(data, Exception):
+            continue
+        cache_key = ResultCache.key(data, version)
+        cached = result_cache.get(cache_key)
+        if cached:
+            results[index] = {'filename': filename, 'parsed_data': cached[0], 'analysis': cached[1]}
+        else:
+            misses.append((index, cache_key))
+    processed = batch.analyze_documents([documents[index] for index, _ in misses], extractor=extraction_pool)
+    for (index, cache_key), result in zip(misses, processed):
+        results[index] = result
+        if 'error' not in result:
+            result_cache.put(cache_key, result['parsed_data'], result['analysis'])
+    for index, (filename, data) in enumerate(documents):
+        if isinstance(data, Exception):
+            results[index] = {'filename': filename, 'error': str(data)}
+
+    # Near-duplicates of stored resumes are linked to the same candidate, or
+    # with ?dedupe=1 answered with the stored analysis id and not saved
+    dedupe = request_flag('dedupe')
+    records = []
+    for index, result in enumerate(results):
+        if 'error' in result:
+            continue
+        record = {'parsed_data': result['parsed_data'], 'analysis': result['analysis'], 'filename': result['filename']}
+        duplicate = link_duplicate(record)
+        if duplicate and dedupe:
+            results[index] = {
+                'filename': result['filename'],
+                '_id': duplicate['_id'],
+                'duplicate': True,
+                'similarity': duplicate['similarity']
+            }
+        else:
+            records.append(record)
+
+    # One bulk write for every successfully analyzed file
+    if records:
+        db_result = db.save_analyses(records)
+        for record, inserted_id in zip(records, db_result.inserted_ids):
+            record['_id'] = str(inserted_id)
+
+    saved = iter(records)
+    response = []
+    for result in results:
+        if 'error' in result or result.get('duplicate'):
+            response.append(result)
+        else:
+            record = next(saved)
+            response.append(apply_projection({
+                key: record[key]
+                for key in ('_id', 'filename', 'parsed_data', 'analysis', 'candidate_id', 'duplicate_of')
+                if key in record
+            }, SUMMARY_PROJECTION))
+    return jsonify({'results': response})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus text exposition format
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.get_stats())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job:
+        return jsonify(job)
+    return jsonify({'error': 'Job not found'}), 404
 
 @app.route('/api/analyze-linkedin-url', methods=['POST'])
 def analyze_linkedin_url():
@@ -92,10 +347,12 @@ def analyze_linkedin_url():
         return jsonify({'error': 'LinkedIn URL is required'}), 400
     
     url = data['url'].strip()
+    timer = g.timer = StageTimer()
     
     try:
         # Comprehensive LinkedIn analysis
-        linkedin_analysis = linkedin_analyzer.analyze_profile_comprehensive(url)
+        with timer.stage('analyze'):
+            linkedin_analysis = linkedin_analyzer.analyze_profile_comprehensive(url)
         
         analysis = linkedin_analysis
         
@@ -110,18 +367,134 @@ def analyze_linkedin_url():
             'url': url
         }
         
-        db_result = db.save_analysis(result)
+        with timer.stage('store'):
+            db_result = db.save_analysis(result)
         result['_id'] = db_result.inserted_id
         
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        metrics.observe_stages(timer, 'analyze_linkedin_url', 'linkedin_url')
+
+@app.route('/api/analyze-linkedin-urls', methods=['POST'])
+def analyze_linkedin_urls():
+    # Body: {"urls": [...]}; the profiles are fetched concurrently and the
+    # analyses saved with one bulk write, in the order of the urls
+    data = request.get_json(silent=True)
+    urls = data.get('urls') if isinstance(data, dict) else None
+    if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+        return jsonify({'error': 'A list of LinkedIn URLs is required'}), 400
+    if len(urls) > MAX_BATCH_URLS:
+        return jsonify({'error': f'At most {MAX_BATCH_URLS} URLs per batch'}), 400
+
+    urls = [url.strip() for url in urls]
+    timer = g.timer = StageTimer()
+    try:
+        with timer.stage('analyze'):
+            analyses = linkedin_analyzer.analyze_profiles(urls)
+        records = [{
+            'parsed_data': {
+                'profile_url': url,
+                'certificates': analysis.get('certificates_analysis', {}),
+                'activity': analysis.get('activity_analysis', {}),
+                'type': 'linkedin_url'
+            },
+            'analysis': analysis,
+            'url': url
+        } for url, analysis in zip(urls, analyses)]
+        with timer.stage('store'):
+            db_result = db.save_analyses(records)
+        for record, inserted_id in zip(records, db_result.inserted_ids):
+            record['_id'] = str(inserted_id)
+        return jsonify({'results': records})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        metrics.observe_stages(timer, 'analyze_linkedin_urls', 'linkedin_url')
 
 @app.route('/api/analyses', methods=['GET'])
 def get_analyses():
-    analyses = db.get_all_analyses()
-    return jsonify(analyses)
+    # ?limit=&cursor=&fields=summary|full|<comma separated paths>
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    try:
+        page = db.get_analyses_page(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            projection=parse_fields(request.args.get('fields'))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+@app.route('/api/export', methods=['GET'])
+def export_archive():
+    # ?format=ndjson|csv&fields=summary|full|<comma separated paths>&since=&until=
+    # Streamed from storage a page at a time, so memory use does not grow
+    # with the archive
+    export_format = request.args.get('format', 'ndjson')
+    try:
+        chunks = export_analyses(
+            db,
+            format=export_format,
+            fields=request.args.get('fields'),
+            since=request.args.get('since'),
+            until=request.args.get('until')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(chunks, mimetype=FORMATS[export_format], headers={
+        'Content-Disposition': f'attachment; filename=analyses.{export_format}'
+    })
+
+@app.route('/api/search', methods=['GET'])
+def search_analyses():
+    # ?q=Python AND Docker overall_score>70&limit=
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    db.refresh()
+    try:
+        return jsonify(search_index.search(request.args.get('q', ''), limit=limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    # ?days=30&top=20: totals kept up to date on every save, so this only
+    # picks up what other workers saved
+    db.refresh()
+    days = min(max(request.args.get('days', 30, type=int), 0), 366)
+    top = min(max(request.args.get('top', 20, type=int), 1), 100)
+    return jsonify(aggregates.summary(days=days, top=top))
+
+@app.route('/api/stats/rebuild', methods=['POST'])
+def rebuild_stats():
+    # Recomputes the totals from storage, e.g. after editing records by hand
+    aggregates.rebuild(iter_analyses(db, REBUILD_PROJECTION))
+    return jsonify(aggregates.summary())
+
+@app.route('/api/match', methods=['POST'])
+def match_job_description():
+    # {"job_description": "...", "top_k": 10} -> stored resumes ranked by
+    # similarity to the job description
+    data = request.get_json(silent=True) or {}
+    job_description = (data.get('job_description') or '').strip()
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+    try:
+        top_k = min(max(int(data.get('top_k', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be a number'}), 400
+    db.refresh()
+    return jsonify(match_index.match(job_description, top_k=top_k))
+
+@app.route('/api/analysis/<analysis_id>/duplicates', methods=['GET'])
+def get_duplicates(analysis_id):
+    db.refresh()
+    duplicates = duplicate_index.find_similar(analysis_id)
+    if duplicates is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    return jsonify({'duplicates': duplicates})
 
 @app.route('/api/analysis/<analysis_id>', methods=['GET'])
 def get_analysis(analysis_id):
@@ -134,7 +507,16 @@ if __name__ == '__main__':
     print('Starting Resume Analyzer API on http://localhost:5000')
     print('Available endpoints:')
     print('  GET  / - API info')
-    print('  POST /api/upload-resume - Upload resume')
+    print('  POST /api/upload-resume - Upload resume (?async=1 to queue it)')
+    print('  GET  /api/jobs/<id> - Status of a queued upload')
+    print('  POST /api/upload-resumes - Upload a batch of resumes or a ZIP')
     print('  POST /api/analyze-linkedin-url - Analyze LinkedIn profile URL')
-    print('  GET  /api/analyses - Get all analyses')
+    print('  POST /api/analyze-linkedin-urls - Analyze a batch of LinkedIn profile URLs')
+    print('  GET  /api/analyses - List analyses (paginated)')
+    print('  GET  /api/export - Stream analyses as NDJSON or CSV')
+    print('  GET  /api/search - Search analyses by skill, text and score')
+    print('  GET  /api/metrics - Stage timings and counters (Prometheus format)')
+    print('  POST /api/match - Rank stored resumes against a job description')
+    print('  GET  /api/stats - Score, skill and upload totals')
+    print('  GET  /api/analysis/<id>/duplicates - Near-duplicates of an analysis')
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Compares streaming DOCX extraction with the python-docx object model it
+replaced.
+
+Times ResumeParser.extract_text_from_docx against the previous
+implementation (python-docx's Document, joining paragraph.text) on synthetic
+resumes of growing size, along with the time to the first chunk of
+iter_docx_text and the peak memory allocated by each path (tracemalloc, which
+sees Python allocations only: python-docx's lxml tree is not counted, so its
+figure is a lower bound).
+A resume laid out with a header, a footer and a table checks that their
+text is extracted.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_docx [--repeat N] [--quick] [--output FILE]
+
+Results are one JSON document (stdout, or FILE with --output).
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic import make_docx
+from utils.parsers import ResumeParser
+
+FULL = {'pages': [1, 10, 50, 200], 'repeat': 20}
+QUICK = {'pages': [1, 10], 'repeat': 5}
+
+def legacy_extract(source):
+    # The pre-streaming implementation, kept here as the benchmark baseline
+    from docx import Document
+    doc = Document(io.BytesIO(source))
+    return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+
+def make_template_docx():
+    # Contact details in the header and the skills in a table, as many
+    # resume templates lay them out
+    from docx import Document
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = 'Jane Roe | jane.roe@example.com | +1 555 123 4567'
+    document.sections[0].footer.paragraphs[0].text = 'References available on request'
+    document.add_paragraph('Software engineer with 6 years of experience')
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = 'Skills'
+    table.cell(0, 1).text = 'Python, Docker, Kubernetes, PostgreSQL'
+    table.cell(1, 0).text = 'Education'
+    table.cell(1, 1).text = 'B.Tech Computer Science, ABC Institute of Technology'
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def summarize(name, params, samples):
+    # samples are seconds; results are microseconds
+    ordered = sorted(samples)
+    return {
+        'name': name,
+        'params': params,
+        'samples': len(ordered),
+        'mean_us': round(statistics.mean(ordered) * 1e6, 1),
+        'p50_us': round(ordered[len(ordered) // 2] * 1e6, 1),
+        'min_us': round(ordered[0] * 1e6, 1)
+    }
+
+def measure(func, inputs):
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def peak_memory(func, value):
+    tracemalloc.start()
+    try:
+        func(value)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_pages(parser, pages_list, repeat):
+    first_chunk = lambda source: next(parser.iter_docx_text(source))
+    for pages in pages_list:
+        documents = [make_docx(pages, seed) for seed in range(repeat)]
+        params = {'pages': pages, 'bytes': len(documents[0])}
+        for name, func in (('python_docx', legacy_extract), ('streaming', parser.extract_text_from_docx)):
+            result = summarize(name, params, measure(func, documents))
+            result['peak_bytes'] = peak_memory(func, documents[0])
+            yield result
+        yield summarize('streaming_first_chunk', params, measure(first_chunk, documents))
+
+def bench_template(parser):
+    source = make_template_docx()
+    expected = ['jane.roe@example.com', 'Kubernetes', 'ABC Institute', 'References available']
+    for name, func in (('python_docx', legacy_extract), ('streaming', parser.extract_text_from_docx)):
+        text = func(source)
+        yield {'name': f'{name}_template', 'found': [value for value in expected if value in text], 'chars': len(text)}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=None, help='samples per benchmark')
+    arg_parser.add_argument('--quick', action='store_true', help='fewer sizes and samples')
+    arg_parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = arg_parser.parse_args()
+
+    config = dict(QUICK if args.quick else FULL)
+    if args.repeat:
+        config['repeat'] = args.repeat
+    parser = ResumeParser()
+    results = list(bench_pages(parser, config['pages'], config['repeat'])) + list(bench_template(parser))
+
+    report = json.dumps({
+        'benchmark': 'docx',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Compares the single-pass extraction engine with the per-field regexes it
+replaced (email, phone, education and the analyzer's experience years).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_extraction [--repeat N] [--scale N]
+
+Resume texts come from analyses.json when it exists, otherwise a synthetic
+resume is used. Prints one JSON object with timings in microseconds per resume.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from utils import extraction
+
+SYNTHETIC_RESUME = '''Jane Doe
+Email: jane.doe@example.com | Phone: +1 555-123-4567
+B.Tech Computer Science, ABC Institute of Technology (2016 - 2020)
+CGPA: 8.7
+Higher Secondary, XYZ School 2016 - Percentage: 91.5
+Software engineer with 4 years of experience building Python and React
+services on AWS, plus 2 yrs of data engineering work.
+'''
+
+def legacy_extract(text):
+    # The pre-engine implementation, kept here as the benchmark baseline
+    email = None
+    for pattern in [
+        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+        r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        r'Email[:\s]*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})'
+    ]:
+        emails = re.findall(pattern, text, re.IGNORECASE)
+        if emails:
+            email = emails[0]
+            break
+
+    phone = None
+    for pattern in [
+        r'(?:Phone|Mobile|Tel|Contact)[:\s]*([+]?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})',
+        r'([+]?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})',
+        r'([+]?\d{10,15})',
+        r'(\d{3}[\s.-]\d{3}[\s.-]\d{4})'
+    ]:
+        phones = re.findall(pattern, text, re.IGNORECASE)
+        if phones and len(re.sub(r'[^\d+]', '', phones[0])) >= 10:
+            phone = phones[0]
+            break
+
+    education = []
+    for pattern in [
+        r'CGPA[:\s]*([0-9]\.[0-9]{1,2})',
+        r'GPA[:\s]*([0-9]\.[0-9]{1,2})',
+        r'([0-9]\.[0-9]{1,2})[\s]*CGPA',
+        r'([0-9]\.[0-9]{1,2})[\s]*/[\s]*([0-9]\.[0-9]{1,2})'
+    ]:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            education.append(f"CGPA: {match[0] if isinstance(match, tuple) else match}")
+    for pattern in [
+        r'([0-9]{1,2}\.[0-9]{1,2})%',
+        r'([0-9]{1,2})%',
+        r'Percentage[:\s]*([0-9]{1,2}\.[0-9]{1,2})',
+        r'([0-9]{1,2}\.[0-9]{1,2})[\s]*percent'
+    ]:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            percentage = float(match) if match.replace('.', '').isdigit() else 0
+            if 30 <= percentage <= 100:
+                education.append(f"Percentage: {match}%")
+    degree_keywords = ['bachelor', 'master', 'phd', 'degree', 'diploma', 'b.tech', 'm.tech', 'mba']
+    for line in text.split('\n'):
+        line_clean = line.strip()
+        if len(line_clean) > 10 and any(keyword in line.lower() for keyword in degree_keywords):
+            if not any(skip in line.lower() for skip in ['email', 'phone', 'address', 'skill', 'experience', 'work']):
+                if re.search(r'(19|20)\d{2}', line) or any(word in line.lower() for word in ['university', 'college', 'institute']):
+                    education.append(line_clean)
+
+    years = [int(year) for year in re.findall(r'(\d+)\s*(?:years?|yrs?)', text.lower())]
+    return email, phone, education[:5], sum(years)
+
+def engine_extract(text):
+    result = extraction.combine([extraction.scan(text)])
+    return result.email, result.phone, list(result.education[:5]), sum(result.experience_years)
+
+def load_corpus(path='analyses.json'):
+    texts = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for record in json.load(f):
+                text = record.get('parsed_data', {}).get('text')
+                if text:
+                    texts.append(text)
+    return texts or [SYNTHETIC_RESUME]
+
+def time_per_resume(func, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(texts) * 1e6
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    arg_parser.add_argument('--scale', type=int, default=1, help='concatenate each text N times')
+    args = arg_parser.parse_args()
+
+    texts = ['\n'.join([text] * args.scale) for text in load_corpus()]
+    mismatches = sum(1 for text in texts if legacy_extract(text) != engine_extract(text))
+    legacy = time_per_resume(legacy_extract, texts, args.repeat)
+    engine = time_per_resume(engine_extract, texts, args.repeat)
+    print(json.dumps({
+        'benchmark': 'extraction',
+        'resumes': len(texts),
+        'avg_chars': sum(len(text) for text in texts) // len(texts),
+        'legacy_us_per_resume': round(legacy, 1),
+        'engine_us_per_resume': round(engine, 1),
+        'speedup': round(legacy / engine, 2),
+        'output_mismatches': mismatches
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
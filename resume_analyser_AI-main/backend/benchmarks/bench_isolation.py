@@ -0,0 +1,125 @@
+"""Measures upload latency with adversarial PDFs in the mix, with document
+extraction in the request threads and in an ExtractionPool.
+
+Concurrent clients run the upload pipeline (extract, parse, score) over a
+stream of synthetic resumes in which every Nth document is a small PDF whose
+content stream takes seconds to extract. Reported per mode: latency
+percentiles of the ordinary uploads, the latency and outcome of the
+adversarial ones, and the wall time of the whole run. Inline, an adversarial
+upload runs to completion and holds the GIL the ordinary ones need; in the
+pool it is cut off at the extraction timeout.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_isolation [--quick] [--output FILE]
+
+Results are one JSON document (stdout, or FILE with --output).
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.synthetic import make_docx, make_pdf, make_slow_pdf
+from services.analyzer import ProfileAnalyzer
+from services.extraction_pool import ExtractionError, ExtractionPool
+from services.pipeline import analyze_document
+from utils.parsers import ResumeParser
+
+FULL = {'uploads': 200, 'adversarial_every': 50, 'operators': 300000, 'clients': 4, 'workers': 4, 'timeout': 2.0}
+QUICK = {'uploads': 40, 'adversarial_every': 20, 'operators': 100000, 'clients': 4, 'workers': 4, 'timeout': 1.0}
+
+def make_uploads(count, adversarial_every, operators):
+    slow = make_slow_pdf(operators)
+    uploads = []
+    for number in range(count):
+        if number % adversarial_every == adversarial_every // 2:
+            uploads.append(('adversarial', 'slow.pdf', slow))
+        elif number % 2:
+            uploads.append(('normal', 'resume.docx', make_docx(2, number)))
+        else:
+            uploads.append(('normal', 'resume.pdf', make_pdf(2, number)))
+    return uploads
+
+def percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def summarize(samples):
+    # samples are seconds; results are milliseconds
+    ordered = sorted(samples)
+    return {
+        'samples': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.5) * 1e3, 1),
+        'p99_ms': round(percentile(ordered, 0.99) * 1e3, 1),
+        'max_ms': round(ordered[-1] * 1e3, 1)
+    }
+
+def run(uploads, clients, extractor):
+    parser = ResumeParser()
+    analyzer = ProfileAnalyzer()
+
+    def upload(item):
+        kind, filename, data = item
+        start = time.perf_counter()
+        try:
+            analyze_document(parser, analyzer, data, filename, extractor=extractor)
+            outcome = 'ok'
+        except ExtractionError as e:
+            outcome = e.code
+        return kind, time.perf_counter() - start, outcome
+
+    # Warm-up: starts the pool's workers
+    for _ in range(clients):
+        upload(uploads[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        results = list(executor.map(upload, uploads))
+    wall = time.perf_counter() - start
+    report = {'wall_seconds': round(wall, 2)}
+    for kind in ('normal', 'adversarial'):
+        samples = [seconds for result_kind, seconds, _ in results if result_kind == kind]
+        report[kind] = dict(summarize(samples), outcomes=dict(Counter(outcome for result_kind, _, outcome in results if result_kind == kind)))
+    return report
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--quick', action='store_true', help='fewer uploads and cheaper adversarial documents')
+    arg_parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = arg_parser.parse_args()
+
+    config = dict(QUICK if args.quick else FULL)
+    uploads = make_uploads(config['uploads'], config['adversarial_every'], config['operators'])
+    results = [dict(run(uploads, config['clients'], None), name='inline')]
+    pool = ExtractionPool(workers=config['workers'], timeout=config['timeout'])
+    try:
+        results.append(dict(run(uploads, config['clients'], pool), name='isolated', pool=pool.get_stats()))
+    finally:
+        pool.close()
+
+    report = json.dumps({
+        'benchmark': 'isolation',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
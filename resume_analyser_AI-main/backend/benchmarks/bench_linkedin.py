@@ -0,0 +1,144 @@
+"""Benchmark for LinkedIn profile fetching and analysis.
+
+Serves profile documents from a local stub HTTP server that answers each
+request after a fixed latency, and times AdvancedLinkedInAnalyzer on batches
+of distinct profiles: one at a time through analyze_profile_comprehensive
+(the pre-batch path, with the cache off), through analyze_profiles at growing
+worker counts, and analyze_profiles again with every profile cached. The
+stub counts connections, so the report also shows how many requests each
+pooled connection served.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_linkedin [--profiles N] [--latency MS] [--quick]
+                                        [--output FILE]
+
+Results are one JSON document (stdout, or FILE with --output).
+"""
+import argparse
+import json
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.linkedin_advanced import AdvancedLinkedInAnalyzer
+from utils.profile_fetcher import ProfileFetcher
+
+FULL = {'profiles': 200, 'latency_ms': 50, 'workers': [1, 4, 8, 16, 32]}
+QUICK = {'profiles': 40, 'latency_ms': 20, 'workers': [1, 8]}
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep the connection open between requests;
+    # headers and body are written separately, so Nagle's algorithm would
+    # hold the body back until the client's delayed ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        profile_id = self.path.rstrip('/').rsplit('/', 1)[-1]
+        body = json.dumps({
+            'profile_id': profile_id,
+            'connections': 100 + len(profile_id) * 10,
+            'posts': [{'content': 'Shipped a project on cloud infrastructure', 'date': '2024-09-01'}],
+            'certificates': [{'name': 'Data Science Certificate', 'skill': 'Data Science', 'date': '2024-07-01'}]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub(latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run(name, params, server, func, count):
+    connections = server.connections
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return {
+        'name': name,
+        'params': params,
+        'profiles': count,
+        'seconds': round(elapsed, 3),
+        'profiles_per_second': round(count / elapsed, 1),
+        'connections': server.connections - connections
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--profiles', type=int, default=None, help='distinct profiles per run')
+    arg_parser.add_argument('--latency', type=float, default=None, help='stub response latency in milliseconds')
+    arg_parser.add_argument('--quick', action='store_true', help='fewer profiles and worker counts')
+    arg_parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = arg_parser.parse_args()
+
+    config = dict(QUICK if args.quick else FULL)
+    if args.profiles:
+        config['profiles'] = args.profiles
+    if args.latency is not None:
+        config['latency_ms'] = args.latency
+    server = start_stub(config['latency_ms'] / 1000)
+    profile_url = f'http://127.0.0.1:{server.server_address[1]}/in/{{profile_id}}'
+    count = config['profiles']
+    results = []
+
+    # A fresh set of profile ids per run, so only the cached run hits the cache
+    def urls(run_name):
+        return [f'https://www.linkedin.com/in/{run_name}-{i}' for i in range(count)]
+
+    # The rate limit is off: the stub stands in for a source without one
+    serial = AdvancedLinkedInAnalyzer(profile_url, ProfileFetcher(max_workers=1, rate_limit=0, cache_ttl=0))
+    results.append(run('serial', {}, server, lambda: [serial.analyze_profile_comprehensive(url) for url in urls('serial')], count))
+    serial.fetcher.close()
+
+    for workers in config['workers']:
+        analyzer = AdvancedLinkedInAnalyzer(profile_url, ProfileFetcher(max_workers=workers, rate_limit=0))
+        batch = urls(f'batch{workers}')
+        results.append(run('analyze_profiles', {'workers': workers}, server, lambda: analyzer.analyze_profiles(batch), count))
+        if workers == config['workers'][-1]:
+            results.append(run('analyze_profiles_cached', {'workers': workers}, server, lambda: analyzer.analyze_profiles(batch), count))
+        analyzer.fetcher.close()
+    server.shutdown()
+
+    report = json.dumps({
+        'benchmark': 'linkedin',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Benchmark suite for the parse -> analyze -> store pipeline.
+
+Times text extraction from synthetic PDF and DOCX resumes of growing size,
+each ResumeParser.extract_* method, ProfileAnalyzer.analyze_resume,
+SimpleStorage writes and reads at growing archive sizes, saves from
+concurrent threads (group commit), and end-to-end
+/api/upload-resume through the Flask test client.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pipeline [--repeat N] [--quick] [--output FILE]
+                                        [--compare BASELINE] [--tolerance RATIO]
+
+Results are one JSON document (stdout, or FILE with --output) with an entry
+per benchmark and parameter set. With --compare, each p50 is checked against
+the same entry of an earlier run; the comparison goes to stderr and the exit
+status is 1 if any entry is slower by more than the tolerance.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import make_docx, make_pdf, resume_text
+from models.simple_storage import SimpleStorage
+from services.analyzer import ProfileAnalyzer
+from utils.parsers import ResumeParser
+
+FULL = {'pages': [1, 3, 10], 'archive_sizes': [100, 1000, 10000], 'threads': [1, 4, 16], 'repeat': 20}
+QUICK = {'pages': [1, 3], 'archive_sizes': [100, 1000], 'threads': [1, 4], 'repeat': 5}
+
+def summarize(name, params, samples):
+    # samples are seconds; results are microseconds
+    ordered = sorted(samples)
+    return {
+        'name': name,
+        'params': params,
+        'samples': len(ordered),
+        'mean_us': round(statistics.mean(ordered) * 1e6, 1),
+        'p50_us': round(ordered[len(ordered) // 2] * 1e6, 1),
+        'p95_us': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1e6, 1),
+        'min_us': round(ordered[0] * 1e6, 1)
+    }
+
+def measure(func, inputs):
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def bench_extraction(parser, pages_list, repeat):
+    for pages in pages_list:
+        pdfs = [make_pdf(pages, seed) for seed in range(repeat)]
+        yield summarize('extract_text_from_pdf', {'pages': pages}, measure(parser.extract_text_from_pdf, pdfs))
+        docxs = [make_docx(pages, seed) for seed in range(repeat)]
+        yield summarize('extract_text_from_docx', {'pages': pages}, measure(parser.extract_text_from_docx, docxs))
+
+def bench_fields(parser, pages_list, repeat):
+    # Every call gets a text it has not seen, so the shared extraction cache
+    # never answers and each number is a full scan
+    methods = ['extract_email', 'extract_phone', 'extract_skills', 'extract_education']
+    for pages in pages_list:
+        for offset, method in enumerate(methods):
+            texts = [resume_text(pages, (offset + 1) * 100000 + seed) for seed in range(repeat)]
+            yield summarize(method, {'pages': pages}, measure(getattr(parser, method), texts))
+
+def bench_analyze(parser, analyzer, pages_list, repeat):
+    # As in the upload path, each record is parsed just before it is scored
+    for pages in pages_list:
+        samples = []
+        for seed in range(repeat):
+            parsed_data = parser.parse_pages([resume_text(pages, 200000 + seed)])
+            samples.extend(measure(analyzer.analyze_resume, [parsed_data]))
+        yield summarize('analyze_resume', {'pages': pages}, samples)
+
+def bench_storage(parser, analyzer, archive_sizes, repeat):
+    parsed_data = parser.parse_pages([resume_text(1, 300000)])
+    record = json.dumps({'parsed_data': parsed_data, 'analysis': analyzer.analyze_resume(parsed_data), 'filename': 'resume.pdf'})
+    for size in archive_sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SimpleStorage(data_dir=os.path.join(directory, 'store'), legacy_file=os.path.join(directory, 'none.json'))
+            for start in range(0, size, 500):
+                storage.save_analyses([json.loads(record) for _ in range(min(500, size - start))])
+            params = {'archive_size': size}
+            yield summarize('save_analysis', params, measure(storage.save_analysis, [json.loads(record) for _ in range(repeat)]))
+            yield summarize('get_analyses_page', params, measure(lambda _: storage.get_analyses_page(limit=20), range(repeat)))
+            yield summarize('get_all_analyses', params, measure(lambda _: storage.get_all_analyses(), range(min(repeat, 5))))
+            storage.close()
+
+def bench_concurrent_saves(parser, analyzer, thread_counts, repeat):
+    # Each sample is the wall time of `threads` threads saving `repeat`
+    # records each, divided by the number of records saved
+    parsed_data = parser.parse_pages([resume_text(1, 300000)])
+    record = json.dumps({'parsed_data': parsed_data, 'analysis': analyzer.analyze_resume(parsed_data), 'filename': 'resume.pdf'})
+    for threads in thread_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SimpleStorage(data_dir=os.path.join(directory, 'store'), legacy_file=os.path.join(directory, 'none.json'))
+            def save_all(_):
+                workers = [
+                    threading.Thread(target=lambda: [storage.save_analysis(json.loads(record)) for _ in range(repeat)])
+                    for _ in range(threads)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            samples = [elapsed / (threads * repeat) for elapsed in measure(save_all, range(3))]
+            yield summarize('save_analysis_concurrent', {'threads': threads}, samples)
+            storage.close()
+
+def bench_upload(pages_list, repeat):
+    # Imports the app inside a scratch directory so its storage, job queue and
+    # indexes start empty; the result cache is disabled on disk and every file
+    # is distinct, so each request runs the whole pipeline
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.environ['RESULT_CACHE_DIR'] = ''
+        try:
+            import app
+            client = app.app.test_client()
+            for pages in pages_list:
+                for extension, make in (('pdf', make_pdf), ('docx', make_docx)):
+                    documents = [make(pages, 400000 + seed) for seed in range(repeat)]
+                    def upload(data):
+                        response = client.post(
+                            '/api/upload-resume',
+                            data={'file': (io.BytesIO(data), f'resume.{extension}')},
+                            content_type='multipart/form-data'
+                        )
+                        if response.status_code != 200:
+                            raise RuntimeError(response.get_json())
+                    yield summarize('upload_resume', {'format': extension, 'pages': pages}, measure(upload, documents))
+        finally:
+            os.chdir(cwd)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    # Prints p50 ratios against the baseline and returns the regressions
+    previous = {(entry['name'], json.dumps(entry['params'], sort_keys=True)): entry for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['name'], json.dumps(entry['params'], sort_keys=True)))
+        if old is None or not old['p50_us']:
+            continue
+        ratio = entry['p50_us'] / old['p50_us']
+        flag = ''
+        if ratio > tolerance:
+            regressions.append(entry)
+            flag = '  REGRESSION'
+        print(f"{entry['name']:<24} {json.dumps(entry['params']):<34} {old['p50_us']:>12.1f} -> {entry['p50_us']:>12.1f} us  x{ratio:.2f}{flag}", file=sys.stderr)
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=None, help='samples per benchmark')
+    arg_parser.add_argument('--quick', action='store_true', help='fewer sizes and samples')
+    arg_parser.add_argument('--output', help='write the results to this file instead of stdout')
+    arg_parser.add_argument('--compare', help='results of an earlier run to compare against')
+    arg_parser.add_argument('--tolerance', type=float, default=1.25, help='p50 ratio counted as a regression')
+    args = arg_parser.parse_args()
+
+    config = dict(QUICK if args.quick else FULL)
+    if args.repeat:
+        config['repeat'] = args.repeat
+    parser = ResumeParser()
+    analyzer = ProfileAnalyzer()
+    results = []
+    for benchmark in (
+        bench_extraction(parser, config['pages'], config['repeat']),
+        bench_fields(parser, config['pages'], config['repeat']),
+        bench_analyze(parser, analyzer, config['pages'], config['repeat']),
+        bench_storage(parser, analyzer, config['archive_sizes'], config['repeat']),
+        bench_concurrent_saves(parser, analyzer, config['threads'], config['repeat']),
+        bench_upload(config['pages'], config['repeat'])
+    ):
+        results.extend(benchmark)
+
+    report = json.dumps({
+        'benchmark': 'pipeline',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
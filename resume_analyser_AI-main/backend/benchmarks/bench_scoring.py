@@ -0,0 +1,70 @@
+"""Compares ProfileAnalyzer.analyze_batch with calling analyze_resume once per
+record, and checks that both give identical results.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_scoring [--repeat N] [--scale N]
+
+Records come from the parsed_data stored in analyses.json when it exists,
+otherwise from the synthetic resume. Exits with status 1 if any result differs.
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.bench_extraction import load_corpus
+from services.analyzer import ProfileAnalyzer
+from utils.parsers import ResumeParser
+
+def load_records(path='analyses.json'):
+    try:
+        with open(path, 'r') as f:
+            records = [record['parsed_data'] for record in json.load(f) if record.get('parsed_data')]
+    except OSError:
+        records = []
+    if not records:
+        parser = ResumeParser()
+        records = [parser.parse_pages([text]) for text in load_corpus(path)]
+    return records
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--scale', type=int, default=500, help='repeat the record set N times')
+    args = arg_parser.parse_args()
+
+    analyzer = ProfileAnalyzer()
+    records = load_records() * args.scale
+    scalar_results = [analyzer.analyze_resume(record) for record in records]
+    batch_results = analyzer.analyze_batch(records)
+    # Compare serialized forms so 80 and 80.0 count as different
+    mismatches = sum(
+        1 for scalar, batch in zip(scalar_results, batch_results)
+        if json.dumps(scalar, sort_keys=True) != json.dumps(batch, sort_keys=True)
+    )
+
+    scalar = best_time(lambda: [analyzer.analyze_resume(record) for record in records], args.repeat)
+    batch = best_time(lambda: analyzer.analyze_batch(records), args.repeat)
+    print(json.dumps({
+        'benchmark': 'scoring',
+        'records': len(records),
+        'scalar_us_per_record': round(scalar / len(records) * 1e6, 2),
+        'batch_us_per_record': round(batch / len(records) * 1e6, 2),
+        'speedup': round(scalar / batch, 2),
+        'output_mismatches': mismatches
+    }, indent=2))
+    if mismatches or len(batch_results) != len(records):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
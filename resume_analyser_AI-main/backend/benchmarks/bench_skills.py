@@ -0,0 +1,65 @@
+"""Times SkillMatcher against the old substring loop, and against itself with
+a taxonomy padded with synthetic skills to show that matching cost follows
+text length rather than taxonomy size.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_skills [--repeat N] [--extra-skills N]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_extraction import load_corpus
+from utils.skill_matcher import DEFAULT_TAXONOMY, SkillMatcher
+
+LEGACY_SKILLS = [
+    'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'SQL', 'MongoDB',
+    'AWS', 'Docker', 'Kubernetes', 'Git', 'HTML', 'CSS', 'Angular',
+    'Vue.js', 'Flask', 'Django', 'Express', 'PostgreSQL', 'MySQL'
+]
+
+def legacy_match(skills, text):
+    text_lower = text.lower()
+    return [skill for skill in skills if skill.lower() in text_lower]
+
+def best_time(func, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(texts) * 1e6
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    arg_parser.add_argument('--extra-skills', type=int, default=10000)
+    args = arg_parser.parse_args()
+
+    with open(DEFAULT_TAXONOMY, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    padded = dict(taxonomy, skills=taxonomy['skills'] + [
+        {'name': f'Synthetic Skill {i}', 'aliases': [f'synthskill{i}', f'synth tool {i}']}
+        for i in range(args.extra_skills)
+    ])
+    matcher = SkillMatcher(taxonomy)
+    padded_matcher = SkillMatcher(padded)
+    padded_legacy = LEGACY_SKILLS + [skill['name'] for skill in padded['skills']]
+
+    texts = load_corpus()
+    print(json.dumps({
+        'benchmark': 'skills',
+        'resumes': len(texts),
+        'taxonomy_skills': len(matcher.skills),
+        'padded_skills': len(padded_matcher.skills),
+        'legacy_20_skills_us': round(best_time(lambda t: legacy_match(LEGACY_SKILLS, t), texts, args.repeat), 1),
+        'legacy_padded_us': round(best_time(lambda t: legacy_match(padded_legacy, t), texts, args.repeat), 1),
+        'matcher_us': round(best_time(matcher.match, texts, args.repeat), 1),
+        'matcher_padded_us': round(best_time(padded_matcher.match, texts, args.repeat), 1)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
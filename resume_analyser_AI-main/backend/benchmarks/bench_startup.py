@@ -0,0 +1,137 @@
+"""Startup benchmark for the Flask app.
+
+Builds analysis archives of growing size, then starts the app on each in a
+fresh interpreter and times `import app` (imports, opening storage and
+attaching the indexes) and the time until the background index loads have
+finished. The first start on an archive writes the storage snapshot and the
+index logs; the starts after it show the steady state.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup [--repeat N] [--quick] [--output FILE]
+                                       [--limit SECONDS]
+
+Results are one JSON document (stdout, or FILE with --output). With --limit,
+the exit status is 1 if a steady-state import on any archive takes longer.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import resume_text
+from models.simple_storage import SimpleStorage
+from services.analyzer import ProfileAnalyzer
+from utils.parsers import ResumeParser
+
+FULL = {'archive_sizes': [0, 1000, 10000, 30000], 'repeat': 5}
+QUICK = {'archive_sizes': [0, 1000], 'repeat': 3}
+DISTINCT_RESUMES = 200
+
+# Runs in the child interpreter, with the archive directory as cwd
+CHILD = '''
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+for index in (app.search_index, app.match_index, app.duplicate_index):
+    index.get()
+print(json.dumps({'import': imported - started, 'ready': time.perf_counter() - started}))
+'''
+
+def build_archive(directory, size):
+    parser = ResumeParser()
+    analyzer = ProfileAnalyzer()
+    records = []
+    for seed in range(min(size, DISTINCT_RESUMES)):
+        parsed_data = parser.parse_pages([resume_text(1, 500000 + seed)])
+        parsed_data['type'] = 'resume'
+        records.append(json.dumps({'parsed_data': parsed_data, 'analysis': analyzer.analyze_resume(parsed_data), 'filename': 'resume.pdf'}))
+    storage = SimpleStorage(data_dir=os.path.join(directory, 'analyses_store'), legacy_file=os.path.join(directory, 'none.json'))
+    for start in range(0, size, 1000):
+        storage.save_analyses([json.loads(records[i % len(records)]) for i in range(start, min(start + 1000, size))])
+    storage.close()
+
+def start_app(directory):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=backend, RESULT_CACHE_DIR='')
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['process'] = time.perf_counter() - started
+    return timings
+
+def summarize(name, params, samples):
+    # samples are seconds; results are milliseconds
+    ordered = sorted(samples)
+    return {
+        'name': name,
+        'params': params,
+        'samples': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1e3, 1),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1e3, 1),
+        'max_ms': round(ordered[-1] * 1e3, 1)
+    }
+
+def bench_archive(size, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        build_archive(directory, size)
+        first = start_app(directory)
+        runs = [start_app(directory) for _ in range(repeat)]
+    params = {'archive_size': size}
+    results = [summarize(f'first_{phase}', params, [first[phase]]) for phase in ('import', 'ready')]
+    for phase in ('import', 'ready', 'process'):
+        results.append(summarize(phase, params, [run[phase] for run in runs]))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=None, help='steady-state starts per archive')
+    arg_parser.add_argument('--quick', action='store_true', help='smaller archives and fewer starts')
+    arg_parser.add_argument('--output', help='write the results to this file instead of stdout')
+    arg_parser.add_argument('--limit', type=float, help='maximum steady-state import time in seconds')
+    args = arg_parser.parse_args()
+
+    config = dict(QUICK if args.quick else FULL)
+    if args.repeat:
+        config['repeat'] = args.repeat
+    results = []
+    for size in config['archive_sizes']:
+        results.extend(bench_archive(size, config['repeat']))
+
+    report = json.dumps({
+        'benchmark': 'startup',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+    if args.limit is not None:
+        slow = [entry for entry in results if entry['name'] == 'import' and entry['p50_ms'] > args.limit * 1e3]
+        for entry in slow:
+            print(f"import with {entry['params']['archive_size']} analyses took {entry['p50_ms']} ms", file=sys.stderr)
+        if slow:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Synthetic resumes for the benchmarks: plain text, PDF and DOCX of a given
+number of pages, generated deterministically from a seed so runs on different
+versions see the same documents, and an adversarial PDF that is slow to
+extract.
+"""
+import io
+import random
+import zlib
+
+from docx import Document
+
+FIRST_NAMES = ['Asha', 'Ravi', 'Maria', 'Chen', 'Olu', 'Sara', 'Tom', 'Priya', 'Lena', 'Omar']
+LAST_NAMES = ['Sharma', 'Garcia', 'Okafor', 'Nguyen', 'Smith', 'Kumar', 'Rossi', 'Haddad']
+SKILLS = [
+    'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'SQL', 'MongoDB', 'AWS', 'Docker',
+    'Kubernetes', 'Git', 'HTML', 'CSS', 'Angular', 'Flask', 'Django', 'PostgreSQL', 'Redis',
+    'Kafka', 'Terraform', 'TensorFlow', 'Pandas', 'C++', 'Go', 'Spark', 'GraphQL'
+]
+DEGREES = ['B.Tech in Computer Science', 'Bachelor of Engineering', 'Master of Science', 'MBA', 'PhD in Physics']
+INSTITUTES = ['ABC Institute of Technology', 'State University', 'XYZ College of Engineering']
+VERBS = ['Built', 'Led', 'Designed', 'Migrated', 'Optimised', 'Maintained', 'Automated', 'Shipped']
+OBJECTS = [
+    'a payments service', 'the data pipeline', 'an internal dashboard', 'the search backend',
+    'CI/CD workflows', 'a recommendation engine', 'the mobile API', 'monitoring and alerting'
+]
+LINES_PER_PAGE = 45
+
+def resume_lines(pages=1, seed=0):
+    rng = random.Random(seed)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f'{first} {last}',
+        f'Email: {first.lower()}.{last.lower()}{seed}@example.com | Phone: +1 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+        'Education',
+        f'{rng.choice(DEGREES)}, {rng.choice(INSTITUTES)} ({rng.randint(2005, 2018)} - {rng.randint(2019, 2023)})',
+        f'CGPA: {rng.uniform(6, 9.9):.1f}',
+        f'Higher Secondary, City School - Percentage: {rng.uniform(60, 98):.1f}',
+        f'Experience: {rng.randint(1, 12)} years of professional experience',
+        'Skills: ' + ', '.join(rng.sample(SKILLS, 8))
+    ]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(
+            f'{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)} and '
+            f'{rng.choice(SKILLS)}, over {rng.randint(1, 5)} years'
+        )
+    return lines
+
+def resume_text(pages=1, seed=0):
+    return '\n'.join(resume_lines(pages, seed))
+
+def make_pdf(pages=1, seed=0):
+    # A minimal PDF with one Helvetica text stream per page
+    lines = resume_lines(pages, seed)
+    page_lines = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for chunk in page_lines:
+        page_id = len(objects) + 1
+        kids.append(page_id)
+        objects.append((
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>'
+        ).encode('ascii'))
+        escaped = (line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in chunk)
+        body = ('BT /F1 10 Tf 40 760 Td 16 TL\n' + ''.join(f"({line}) '\n" for line in escaped) + 'ET').encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(body) + body + b'\nendstream')
+    objects[1] = ('<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(f'{kid} 0 R' for kid in kids), len(kids))).encode('ascii')
+    return write_pdf(objects)
+
+def make_slow_pdf(operators=300000):
+    # An adversarial single-page PDF: a few KB of compressed content stream
+    # that expands to that many text-showing operators, which text
+    # extraction works through one at a time
+    body = zlib.compress(b'BT /F1 10 Tf 40 760 Td\n' + b'(ab) Tj 1 0 Td\n' * operators + b'ET', 9)
+    return write_pdf([
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [4 0 R] /Count 1 >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(body) + body + b'\nendstream'
+    ])
+
+def write_pdf(objects):
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+def make_docx(pages=1, seed=0):
+    document = Document()
+    for line in resume_lines(pages, seed):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,102 @@
+"""Maintenance commands for the stored analyses.
+
+Run from the backend directory with the API stopped:
+
+    python manage.py rescore [--chunk-size N] [--workers N] [--checkpoint PATH] [--restart] [--mongo]
+    python manage.py export [--format ndjson|csv] [--fields FIELDS] [--since DATE] [--until DATE]
+                            [--output FILE] [--mongo]
+
+rescore recomputes the analysis of every stored resume with the current
+ProfileAnalyzer rules and weights. Progress goes to stderr and the final
+counts are printed as JSON.
+
+export writes the stored analyses, newest first, as NDJSON or CSV to stdout
+or FILE, reading them a page at a time. FIELDS is summary (the default,
+without the raw resume text), full, or comma separated paths; since is
+inclusive and until exclusive. export can run while the API is up.
+"""
+import argparse
+import json
+import os
+import sys
+
+from models.aggregates import attach_aggregates
+from models.match_index import attach_match_index
+from models.search_index import attach_search_index
+from models.storage import open_storage
+from services.analyzer import ProfileAnalyzer
+from services.export import FORMATS, export_analyses
+from services.rescore import rescore_archive
+
+def open_indexed_storage(mongo):
+    # The indexes are attached so re-scored records stay searchable, and the
+    # aggregates so /api/stats reflects the new scores
+    db = open_storage('mongo' if mongo else None)
+    attach_search_index(db)
+    attach_match_index(db)
+    attach_aggregates(db)
+    return db
+
+def print_progress(state):
+    remaining = max(state['total'] - state['scanned'], 0)
+    eta = remaining / state['rate'] if state['rate'] else 0
+    print(
+        f"\r{state['scanned']}/{state['total']} scanned, {state['updated']} updated, "
+        f"{state['rate']:.0f} records/s, eta {eta:.0f}s",
+        end='', file=sys.stderr, flush=True
+    )
+
+def rescore(args):
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    state = rescore_archive(
+        open_indexed_storage(args.mongo),
+        ProfileAnalyzer(),
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        progress=print_progress
+    )
+    print(file=sys.stderr)
+    print(json.dumps({'scanned': state['scanned'], 'updated': state['updated'], 'version': state['version']}, indent=2))
+
+def export(args):
+    chunks = export_analyses(
+        open_storage('mongo' if args.mongo else None),
+        format=args.format,
+        fields=args.fields,
+        since=args.since,
+        until=args.until
+    )
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            f.writelines(chunks)
+    else:
+        sys.stdout.writelines(chunks)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    rescore_parser = commands.add_parser('rescore', help='re-score stored resumes with the current rules')
+    rescore_parser.add_argument('--chunk-size', type=int, default=500)
+    rescore_parser.add_argument('--workers', type=int, default=None, help='worker processes (default: available CPUs)')
+    rescore_parser.add_argument('--checkpoint', default='rescore.checkpoint.json')
+    rescore_parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    rescore_parser.add_argument('--mongo', action='store_true', help='use MongoDB regardless of STORAGE_BACKEND')
+    rescore_parser.set_defaults(func=rescore)
+
+    export_parser = commands.add_parser('export', help='write stored analyses as NDJSON or CSV')
+    export_parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+    export_parser.add_argument('--fields', default=None, help='summary, full or comma separated paths')
+    export_parser.add_argument('--since', default=None, help='ISO date or datetime, inclusive')
+    export_parser.add_argument('--until', default=None, help='ISO date or datetime, exclusive')
+    export_parser.add_argument('--output', default=None, help='file to write instead of stdout')
+    export_parser.add_argument('--mongo', action='store_true', help='use MongoDB regardless of STORAGE_BACKEND')
+    export_parser.set_defaults(func=export)
+
+    args = arg_parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
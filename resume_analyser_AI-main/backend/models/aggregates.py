@@ -0,0 +1,196 @@
+import bisect
+import itertools
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from models.index_log import IndexLog
+from models.lazy_index import LazyIndex
+from models.query import iter_analyses
+
+SCORE_FIELDS = ['overall_score', 'technical_score', 'experience_score', 'education_score', 'completeness_score']
+HISTOGRAM_BINS = 10
+DEFAULT_AGGREGATES_PATH = os.path.join('analyses_store', 'aggregates.jsonl')
+# What a rebuild reads from storage; the raw text is left out
+REBUILD_PROJECTION = {
+    'parsed_data.type': 1,
+    'parsed_data.skills': 1,
+    'analysis.overall_score': 1,
+    'analysis.detailed_scores': 1,
+    'created_at': 1
+}
+
+def score_values(analysis):
+    # The SCORE_FIELDS of an analysis, None where missing
+    analysis = analysis or {}
+    detailed = analysis.get('detailed_scores') or {}
+    values = [analysis.get('overall_score')] + [detailed.get(field) for field in SCORE_FIELDS[1:]]
+    return tuple(value if isinstance(value, (int, float)) else None for value in values)
+
+def histogram_bin(score):
+    return min(max(int(score * HISTOGRAM_BINS // 100), 0), HISTOGRAM_BINS - 1)
+
+class Aggregates:
+    # Running totals over the stored analyses: records per type, the count,
+    # sum and a histogram of each score, skill frequencies and uploads per
+    # day. The contribution of each analysis is kept, so an updated record
+    # (e.g. re-scored) is taken out of the totals before its new values go
+    # in, and reading the totals never touches storage. Changes are appended
+    # to a JSON lines log that is replayed on start and rewritten there once
+    # most of it is superseded.
+    def __init__(self, path=DEFAULT_AGGREGATES_PATH):
+        self.path = path
+        self.log = IndexLog(path)
+        # _id -> (day, type, scores, skills)
+        self.entries = {}
+        self._reset_totals()
+        self._lock = threading.Lock()
+        self._log_entries = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _reset_totals(self):
+        self.types = Counter()
+        self.score_counts = [0] * len(SCORE_FIELDS)
+        self.score_sums = [0.0] * len(SCORE_FIELDS)
+        self.histograms = [[0] * HISTOGRAM_BINS for _ in SCORE_FIELDS]
+        self.skills = Counter()
+        self.days = Counter()
+        # Every day with uploads, in order, so recent days are a slice
+        self.day_order = []
+
+    def _load(self):
+        # Replays the log; a later entry for an _id replaces the earlier one
+        for entry in self.log.read():
+            self._apply(entry['_id'], (entry['d'], entry['t'], tuple(entry['s']), tuple(entry['k'])))
+            self._log_entries += 1
+        # Every save and re-score appends a line; once most lines are
+        # superseded the log is rewritten from the current entries
+        if self._log_entries > 2 * len(self.entries) + 1000:
+            self._rewrite()
+
+    def _rewrite(self):
+        self.log.rewrite(
+            {'_id': analysis_id, 'd': day, 't': record_type, 's': scores, 'k': skills}
+            for analysis_id, (day, record_type, scores, skills) in self.entries.items()
+        )
+        self._log_entries = len(self.entries)
+
+    def _count(self, entry, sign):
+        day, record_type, scores, skills = entry
+        self.types[record_type] += sign
+        if day:
+            if day not in self.days:
+                bisect.insort(self.day_order, day)
+            self.days[day] += sign
+            if not self.days[day]:
+                del self.days[day]
+                del self.day_order[bisect.bisect_left(self.day_order, day)]
+        for field, score in enumerate(scores):
+            if score is None:
+                continue
+            self.score_counts[field] += sign
+            self.score_sums[field] += sign * score
+            self.histograms[field][histogram_bin(score)] += sign
+        for skill in skills:
+            self.skills[skill] += sign
+
+    def _apply(self, analysis_id, entry):
+        previous = self.entries.get(analysis_id)
+        if previous is not None:
+            self._count(previous, -1)
+        self.entries[analysis_id] = entry
+        self._count(entry, 1)
+
+    @staticmethod
+    def _entry(record, previous):
+        # A saved record, or an update merged over its previous entry. None
+        # for an update of a record that is not counted.
+        if previous is None and 'parsed_data' not in record:
+            return None
+        day, record_type, scores, skills = previous or ('', 'unknown', (None,) * len(SCORE_FIELDS), ())
+        if 'created_at' in record:
+            day = str(record['created_at'] or '')[:10]
+        if 'parsed_data' in record:
+            parsed_data = record['parsed_data'] or {}
+            record_type = parsed_data.get('type') or 'unknown'
+            skills = tuple(dict.fromkeys(skill for skill in parsed_data.get('skills') or () if isinstance(skill, str)))
+        if 'analysis' in record:
+            scores = score_values(record['analysis'])
+        return day, record_type, scores, skills
+
+    def add(self, records):
+        # Storage listener for saves and updates
+        logged = []
+        with self._lock:
+            for record in records:
+                analysis_id = str(record['_id'])
+                entry = self._entry(record, self.entries.get(analysis_id))
+                if entry is None:
+                    continue
+                self._apply(analysis_id, entry)
+                day, record_type, scores, skills = entry
+                logged.append({'_id': analysis_id, 'd': day, 't': record_type, 's': scores, 'k': skills})
+            self.log.append(logged)
+            self._log_entries += len(logged)
+
+    def rebuild(self, records):
+        with self._lock:
+            self.log.rewrite([])
+            self._log_entries = 0
+            self.entries = {}
+            self._reset_totals()
+        # Storage is read outside the lock: a read can notify this listener
+        # of records other processes saved
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, 1000))
+            if not chunk:
+                break
+            self.add(chunk)
+
+    def summary(self, days=30, top=20):
+        # Work depends on days, top and the skill vocabulary, not on the
+        # number of stored analyses. uploads_per_day covers the last `days`
+        # calendar days (UTC, as created_at), today included.
+        first_day = (datetime.utcnow().date() - timedelta(days=max(days, 1) - 1)).isoformat()
+        with self._lock:
+            scores = {}
+            for field, name in enumerate(SCORE_FIELDS):
+                count = self.score_counts[field]
+                scores[name] = {
+                    'count': count,
+                    'mean': round(self.score_sums[field] / count, 2) if count else None,
+                    'histogram': list(self.histograms[field])
+                }
+            return {
+                'total': len(self.entries),
+                'by_type': {record_type: count for record_type, count in sorted(self.types.items()) if count > 0},
+                'scores': scores,
+                'histogram_edges': [bin_start * 100 // HISTOGRAM_BINS for bin_start in range(HISTOGRAM_BINS + 1)],
+                'top_skills': [
+                    {'skill': skill, 'count': count}
+                    for skill, count in self.skills.most_common(top) if count > 0
+                ],
+                'uploads_per_day': {
+                    day: self.days[day] for day in self.day_order[bisect.bisect_left(self.day_order, first_day):]
+                } if days > 0 else {}
+            }
+
+def attach_aggregates(db, path=None, lazy=False):
+    # Loads the totals, rebuilds them when they do not cover every stored
+    # analysis, and keeps them current through the storage listeners. With
+    # lazy, the load is deferred until the totals are first read.
+    # Records saved after this point reach the totals through the listener,
+    # so the load compares them with the count at attach time.
+    stored = db.count_analyses()
+    def load():
+        aggregates = Aggregates(path or os.getenv('AGGREGATES_PATH', DEFAULT_AGGREGATES_PATH))
+        if len(aggregates) != stored:
+            aggregates.rebuild(iter_analyses(db, REBUILD_PROJECTION))
+        return aggregates
+    aggregates = LazyIndex('stats', load) if lazy else load()
+    db.listeners.append(aggregates.add)
+    return aggregates
@@ -1,18 +1,135 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne
+from bson import ObjectId
 from datetime import datetime
 import os
+import uuid
+from models.query import decode_cursor, encode_cursor
 
+# Fields resumes are filtered and ranked on
+INDEXED_FIELDS = [
+    'parsed_data.skills',
+    'analysis.overall_score',
+    'analysis.detailed_scores.technical_score',
+    'analysis.detailed_scores.experience_score',
+    'analysis.detailed_scores.education_score',
+    'analysis.detailed_scores.completeness_score'
+]
+
+# MongoDB backend with the same interface as SimpleStorage. Records get the
+# same string ids, and created_at is returned as an ISO string; documents
+# saved by earlier versions with ObjectId ids can still be looked up.
 class Database:
-    def __init__(self):
-        self.client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
-        self.db = self.client.resume_analyzer
-        
+    def __init__(self, uri=None, db_name=None, client=None):
+        # client is for passing an already configured client, e.g. mongomock
+        self.client = client or MongoClient(
+            uri or os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'),
+            maxPoolSize=int(os.getenv('MONGODB_MAX_POOL_SIZE', '50')),
+            minPoolSize=int(os.getenv('MONGODB_MIN_POOL_SIZE', '0')),
+            maxIdleTimeMS=int(os.getenv('MONGODB_MAX_IDLE_MS', '60000')),
+            serverSelectionTimeoutMS=int(os.getenv('MONGODB_TIMEOUT_MS', '5000'))
+        )
+        self.db = self.client[db_name or os.getenv('MONGODB_DB', 'resume_analyzer')]
+        self.analyses = self.db.analyses
+        # Backs both the newest-first listing and the pagination cursor
+        self.analyses.create_index([('created_at', DESCENDING), ('_id', DESCENDING)])
+        for field in INDEXED_FIELDS:
+            self.analyses.create_index([(field, ASCENDING)])
+        self.analyses.create_index([('candidate_id', ASCENDING)], sparse=True)
+        # Called with the saved or updated records after each write
+        self.listeners = []
+
+    def close(self):
+        self.client.close()
+
+    @staticmethod
+    def _id_query(analysis_id):
+        if ObjectId.is_valid(analysis_id):
+            return {'$in': [analysis_id, ObjectId(analysis_id)]}
+        return analysis_id
+
+    @staticmethod
+    def _output(doc):
+        # Matches what SimpleStorage returns
+        if doc is not None:
+            doc['_id'] = str(doc['_id'])
+            if isinstance(doc.get('created_at'), datetime):
+                doc['created_at'] = doc['created_at'].isoformat()
+        return doc
+
     def save_analysis(self, data):
+        data['_id'] = str(uuid.uuid4())
         data['created_at'] = datetime.utcnow()
-        return self.db.analyses.insert_one(data)
-    
+        result = self.analyses.insert_one(data)
+        data['created_at'] = data['created_at'].isoformat()
+        self._notify([data])
+        return result
+
+    def save_analyses(self, records):
+        # Bulk insert: one unordered insert_many round trip
+        if not records:
+            return type('Result', (), {'inserted_ids': []})()
+        created_at = datetime.utcnow()
+        for data in records:
+            data['_id'] = str(uuid.uuid4())
+            data['created_at'] = created_at
+        result = self.analyses.insert_many(records, ordered=False)
+        for data in records:
+            data['created_at'] = created_at.isoformat()
+        self._notify(records)
+        return result
+
+    def update_analyses(self, updates):
+        # updates is a list of (_id, fields), applied as one bulk write
+        if not updates:
+            return type('Result', (), {'modified_count': 0})()
+        result = self.analyses.bulk_write([
+            UpdateOne({'_id': self._id_query(analysis_id)}, {'$set': fields})
+            for analysis_id, fields in updates
+        ], ordered=False)
+        self._notify([dict(fields, _id=analysis_id) for analysis_id, fields in updates])
+        return result
+
+    def _notify(self, records):
+        for listener in self.listeners:
+            listener(records)
+
+    def refresh(self):
+        # Listeners only hear about this process's writes; there is no log
+        # of other processes' writes to pick up
+        pass
+
+    def count_analyses(self):
+        return self.analyses.estimated_document_count()
+
+    def storage_stats(self):
+        return {'records': self.count_analyses()}
+
     def get_analysis(self, analysis_id):
-        return self.db.analyses.find_one({'_id': analysis_id})
-    
+        return self._output(self.analyses.find_one({'_id': self._id_query(analysis_id)}))
+
     def get_all_analyses(self):
-        return list(self.db.analyses.find().sort('created_at', -1))
\ No newline at end of file
+        return [self._output(doc) for doc in self.analyses.find().sort([('created_at', DESCENDING), ('_id', DESCENDING)])]
+
+    def get_analyses_page(self, limit=20, cursor=None, projection=None):
+        # Newest first; the projection is applied by the server, so summary
+        # listings never transfer the raw resume text
+        query = {}
+        if cursor:
+            created_at, analysis_id = decode_cursor(cursor)
+            created_at = datetime.fromisoformat(created_at)
+            analysis_id = ObjectId(analysis_id) if ObjectId.is_valid(analysis_id) else analysis_id
+            query = {'$or': [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': analysis_id}}
+            ]}
+        analyses = list(
+            self.analyses.find(query, projection)
+            .sort([('created_at', DESCENDING), ('_id', DESCENDING)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(analyses) > limit:
+            analyses = analyses[:limit]
+            last = analyses[-1]
+            next_cursor = encode_cursor(last['created_at'].isoformat(), last['_id'])
+        return {'analyses': [self._output(analysis) for analysis in analyses], 'next_cursor': next_cursor}
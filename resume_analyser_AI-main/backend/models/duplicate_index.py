@@ -0,0 +1,218 @@
+import base64
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+from models.index_log import IndexLog
+from models.lazy_index import LazyIndex
+from models.query import iter_analyses
+from utils.skill_matcher import WORD_RE
+
+# 128 MinHash values split into 16 bands of 8: two resumes share a band
+# bucket with high probability above ~0.7 Jaccard similarity, and matches
+# are then confirmed against DUPLICATE_THRESHOLD on the full signature
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+# Texts with more distinct shingles are signed by the MAX_SHINGLES smallest
+# shingle hashes, a sample near-duplicates share; the hashes are permuted
+# MINHASH_CHUNK at a time, so a signature needs a few MB at most
+MAX_SHINGLES = 50000
+MINHASH_CHUNK = 2048
+# Signatures kept by text digest between an upload's duplicate check and its
+# save, so each text is signed once
+RECENT_SIGNATURES = 1024
+DUPLICATE_THRESHOLD = float(os.getenv('DUPLICATE_THRESHOLD', '0.8'))
+DEFAULT_SIGNATURE_PATH = os.path.join('analyses_store', 'duplicate_signatures.jsonl')
+
+# Fixed seeds so signatures stay comparable across restarts
+_random = np.random.RandomState(20240501)
+_MULTIPLIERS = (_random.randint(1, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64) << np.uint64(32)) | \
+    _random.randint(0, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_INCREMENTS = _random.randint(0, 1 << 62, NUM_PERMUTATIONS, dtype=np.uint64)
+
+def shingles(text):
+    # Hashes of overlapping SHINGLE_WORDS-word runs of the lowercased text
+    words = [word.lower() for word in WORD_RE.findall(text or '')]
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    runs = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))}
+    hashes = np.fromiter((zlib.crc32(run.encode('utf-8')) for run in runs), dtype=np.uint64, count=len(runs))
+    if len(hashes) > MAX_SHINGLES:
+        hashes = np.partition(hashes, MAX_SHINGLES - 1)[:MAX_SHINGLES]
+    return hashes
+
+def minhash(text):
+    # MinHash signature of the text's shingles, or None for empty text. Each
+    # permutation is a multiply-shift hash of the 32-bit shingle hash.
+    hashes = shingles(text)
+    if not len(hashes):
+        return None
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for start in range(0, len(hashes), MINHASH_CHUNK):
+            permuted = (np.outer(_MULTIPLIERS, hashes[start:start + MINHASH_CHUNK]) + _INCREMENTS[:, None]) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+def similarity(first, second):
+    # Estimated Jaccard similarity of two signatures
+    return float(np.count_nonzero(first == second)) / NUM_PERMUTATIONS
+
+class DuplicateIndex:
+    # LSH index of MinHash signatures. Each band of a signature is a bucket
+    # key, so finding near-duplicates of a document only compares it with
+    # documents sharing at least one bucket, not the whole archive. Every
+    # document also carries a candidate id, shared by all uploads of the
+    # same resume.
+    def __init__(self, path=DEFAULT_SIGNATURE_PATH, threshold=DUPLICATE_THRESHOLD):
+        self.path = path
+        self.log = IndexLog(path)
+        self.threshold = threshold
+        self.ids = []
+        self.docs = {}
+        self.candidates = []
+        self.signatures = []
+        self.buckets = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _load(self):
+        for entry in self.log.read():
+            signature = entry.get('s')
+            if signature is not None:
+                signature = np.frombuffer(base64.b64decode(signature), dtype=np.uint32)
+            self._apply(entry['_id'], entry.get('c') or entry['_id'], signature)
+
+    @staticmethod
+    def _band_keys(signature):
+        return [signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes() for band in range(BANDS)]
+
+    def _apply(self, analysis_id, candidate_id, signature):
+        doc = self.docs.get(analysis_id)
+        if doc is not None:
+            self.candidates[doc] = candidate_id
+            if self.signatures[doc] is not None or signature is None:
+                return
+        else:
+            doc = self.docs[analysis_id] = len(self.ids)
+            self.ids.append(analysis_id)
+            self.candidates.append(candidate_id)
+            self.signatures.append(None)
+        self.signatures[doc] = signature
+        if signature is not None:
+            for buckets, key in zip(self.buckets, self._band_keys(signature)):
+                buckets.setdefault(key, []).append(doc)
+
+    def _matches(self, signature, exclude=None):
+        seen = set()
+        matches = []
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            for doc in buckets.get(key, ()):
+                if doc in seen or doc == exclude:
+                    continue
+                seen.add(doc)
+                score = similarity(signature, self.signatures[doc])
+                if score >= self.threshold:
+                    matches.append((score, doc))
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [
+            {'_id': self.ids[doc], 'candidate_id': self.candidates[doc], 'similarity': round(score, 4)}
+            for score, doc in matches
+        ]
+
+    def signature(self, text):
+        # minhash(text), reusing the signature of a text signed recently: the
+        # duplicate check before a save and the listener after it sign the
+        # same text
+        if not text:
+            return None
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._recent_lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                return self._recent[key]
+        signature = minhash(text)
+        with self._recent_lock:
+            self._recent[key] = signature
+            while len(self._recent) > RECENT_SIGNATURES:
+                self._recent.popitem(last=False)
+        return signature
+
+    def find(self, text):
+        # Stored documents whose text is a near-duplicate of this one, most
+        # similar first
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            return self._matches(signature)
+
+    def find_similar(self, analysis_id):
+        # Near-duplicates of a stored document, or None if it is not indexed
+        with self._lock:
+            doc = self.docs.get(analysis_id)
+            if doc is None:
+                return None
+            if self.signatures[doc] is None:
+                return []
+            return self._matches(self.signatures[doc], exclude=doc)
+
+    def add(self, records):
+        # Storage listener: indexes records that carry parsed_data; score-only
+        # updates are ignored
+        entries = []
+        for record in records:
+            if 'parsed_data' not in record:
+                continue
+            analysis_id = str(record['_id'])
+            candidate_id = str(record.get('candidate_id') or analysis_id)
+            signature = self.signature((record['parsed_data'] or {}).get('text'))
+            entries.append((analysis_id, candidate_id, signature))
+        if not entries:
+            return
+        with self._lock:
+            for entry in entries:
+                self._apply(*entry)
+            self.log.append(
+                {
+                    '_id': analysis_id,
+                    'c': candidate_id,
+                    's': None if signature is None else base64.b64encode(signature.tobytes()).decode('ascii')
+                }
+                for analysis_id, candidate_id, signature in entries
+            )
+
+    def rebuild(self, records):
+        with self._lock:
+            self.log.rewrite([])
+            self.ids = []
+            self.docs = {}
+            self.candidates = []
+            self.signatures = []
+            self.buckets = [{} for _ in range(BANDS)]
+        self.add(records)
+
+def attach_duplicate_index(db, path=None, lazy=False):
+    # Loads the signatures, rebuilds them when they do not cover every stored
+    # analysis, and keeps them current through the storage listeners. With
+    # lazy, the load is deferred until the index is first used.
+    # Records saved after this point reach the index through the listener,
+    # so the load compares it with the count at attach time.
+    stored = db.count_analyses()
+    def load():
+        index = DuplicateIndex(path or os.getenv('DUPLICATE_INDEX_PATH', DEFAULT_SIGNATURE_PATH))
+        if len(index) != stored:
+            index.rebuild(iter_analyses(db, {'parsed_data.text': 1, 'candidate_id': 1, 'created_at': 1}))
+        return index
+    index = LazyIndex('duplicate', load) if lazy else load()
+    db.listeners.append(index.add)
+    return index
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class IndexLog:
+    # The JSON lines log an index is replayed from. Worker processes share
+    # one log, so appends, rewrites and removal happen under an exclusive
+    # lock on a lock file next to it. A rewrite goes through a temporary file
+    # of its own before replacing the log, and a process whose handle no
+    # longer points at the log (another one replaced or removed it) reopens
+    # it before appending.
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock_file = open(self.path + '.lock', 'a+b')
+        # Threads of one process share the lock file descriptor
+        self._thread_lock = threading.Lock()
+        self._writer = None
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _open_writer(self):
+        if self._writer is not None:
+            try:
+                current = os.stat(self.path).st_ino == os.fstat(self._writer.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if not current:
+                self._close_writer()
+        if self._writer is None:
+            self._writer = open(self.path, 'ab')
+        return self._writer
+
+    @staticmethod
+    def _encode(entries):
+        for entry in entries:
+            yield (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def read(self):
+        # Yields the logged entries in order, up to a torn last line. Only
+        # the open happens under the lock; entries other processes append
+        # while the rest is read may or may not be included.
+        with self._locked():
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return
+
+    def append(self, entries):
+        lines = b''.join(self._encode(entries))
+        if not lines:
+            return
+        with self._locked():
+            writer = self._open_writer()
+            writer.write(lines)
+            writer.flush()
+
+    def rewrite(self, entries):
+        # Replaces the log with the given entries
+        with self._locked():
+            self._close_writer()
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', prefix=os.path.basename(self.path) + '.')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.writelines(self._encode(entries))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def close(self):
+        with self._thread_lock:
+            self._close_writer()
+            self._lock_file.close()
@@ -0,0 +1,70 @@
+import threading
+import time
+
+class LazyIndex:
+    # Stands in for an index whose load (replaying its log, and rebuilding it
+    # when out of step with storage) is deferred to first use or to a
+    # background thread, so the app starts serving without waiting for it.
+    # Anything that uses the index waits for the load to finish.
+    def __init__(self, name, load):
+        self.name = name
+        self.load_seconds = None
+        self._load = load
+        self._index = None
+        self._lock = threading.Lock()
+        # Records passed to add() while the load runs, and the lock that
+        # hands them over when it finishes
+        self._loading = False
+        self._deferred = []
+        self._deferred_lock = threading.Lock()
+
+    def get(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    started = time.perf_counter()
+                    self._loading = True
+                    try:
+                        index = self._load()
+                    finally:
+                        self._loading = False
+                    # Deferred records go in before any new ones, in order
+                    with self._deferred_lock:
+                        if self._deferred:
+                            index.add(self._deferred)
+                            self._deferred = []
+                        self._index = index
+                    self.load_seconds = time.perf_counter() - started
+                index = self._index
+        return index
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __len__(self):
+        # Documents loaded so far; does not wait for the load
+        index = self._index
+        return len(index) if index is not None else 0
+
+    @property
+    def loaded(self):
+        return self._index is not None
+
+    def add(self, records):
+        # Storage listener; records saved during the load are added after it.
+        # It never waits on a running load: a load reads storage, which
+        # passes records other processes wrote to every listener, including
+        # this index (from its own loader) and indexes whose loaders are in
+        # turn reading storage and waiting on this one.
+        if self._index is None:
+            with self._deferred_lock:
+                if self._index is None and self._loading:
+                    self._deferred.extend(records)
+                    return
+        self.get().add(records)
+
+    def load_in_background(self):
+        thread = threading.Thread(target=self.get, name=f'{self.name}-index-load', daemon=True)
+        thread.start()
+        return thread
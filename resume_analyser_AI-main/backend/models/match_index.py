@@ -0,0 +1,206 @@
+import math
+import os
+import threading
+import time
+import zlib
+import numpy as np
+from models.index_log import IndexLog
+from models.lazy_index import LazyIndex
+from models.query import iter_analyses
+from models.search_index import index_terms
+from utils.skill_matcher import default_matcher
+
+# Terms are hashed into this many dimensions, so there is no vocabulary to
+# keep in sync and a new upload never changes existing vectors
+HASH_DIMENSIONS = 1 << 18
+DEFAULT_VECTOR_PATH = os.path.join('analyses_store', 'match_vectors.jsonl')
+
+def hash_vector(terms):
+    # Sparse (indices, weights) of sublinear term frequencies; terms that hash
+    # to the same dimension are summed
+    if not terms:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    indices = np.fromiter((zlib.crc32(term.encode('utf-8')) for term in terms), dtype=np.int64, count=len(terms))
+    indices &= HASH_DIMENSIONS - 1
+    weights = np.fromiter((1 + math.log(count) for count in terms.values()), dtype=float, count=len(terms))
+    unique, positions = np.unique(indices, return_inverse=True)
+    return unique, np.bincount(positions, weights=weights)
+
+# Vectors added since the last refresh are scored separately; once they are
+# this share of the corpus the matrix, IDF weights and norms are rebuilt
+REFRESH_FRACTION = 0.05
+
+def _empty_vectors():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+class MatchIndex:
+    # TF-IDF matching of a job description against every stored resume.
+    # Each resume's text and skill terms are hashed into a sparse vector of
+    # term frequencies when it is saved. On refresh the vectors are scaled by
+    # IDF, normalised and stored column-sorted (CSC), so a query only reads
+    # the columns of the job description's terms. Vectors added after the
+    # refresh are kept aside and scored in a separate pass until they reach
+    # REFRESH_FRACTION of the corpus; IDF weights only change on refresh.
+    def __init__(self, path=DEFAULT_VECTOR_PATH):
+        self.path = path
+        self.log = IndexLog(path)
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.ids = []
+        self.docs = {}
+        self.doc_freq = np.zeros(HASH_DIMENSIONS)
+        # Raw term frequencies of every vector, row/column/weight
+        self._rows, self._columns, self._weights = _empty_vectors()
+        self._pending = []
+        self._pending_docs = 0
+        # Refreshed matrix: column pointers, rows and normalised TF-IDF weights
+        self._column_ptr = None
+        self._matrix_rows = None
+        self._matrix_weights = None
+        self._idf = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _load(self):
+        for entry in self.log.read():
+            self._apply(entry['_id'], np.array(entry['i'], dtype=np.int64), np.array(entry['w']))
+
+    def _apply(self, analysis_id, indices, weights):
+        doc = self.docs.get(analysis_id)
+        if doc is not None:
+            # Re-parsed record: drop its old vector and refresh on next query
+            self._merge()
+            keep = self._rows != doc
+            self.doc_freq[self._columns[~keep]] -= 1
+            self._rows, self._columns, self._weights = self._rows[keep], self._columns[keep], self._weights[keep]
+            self._idf = None
+        else:
+            doc = self.docs[analysis_id] = len(self.ids)
+            self.ids.append(analysis_id)
+        self.doc_freq[indices] += 1
+        self._pending.append((np.full(len(indices), doc, dtype=np.int64), indices, weights))
+        self._pending_docs += 1
+
+    def _merge(self):
+        # Folds vectors added since the last refresh into the raw arrays
+        if self._pending:
+            rows, columns, weights = zip(*self._pending)
+            self._rows = np.concatenate((self._rows,) + rows)
+            self._columns = np.concatenate((self._columns,) + columns)
+            self._weights = np.concatenate((self._weights,) + weights)
+            self._pending = []
+
+    def add(self, records):
+        # Storage listener: vectorizes records that carry parsed_data, storing
+        # an empty vector when there is no text so every record is counted;
+        # score-only updates are ignored
+        vectors = []
+        for record in records:
+            if 'parsed_data' not in record:
+                continue
+            indices, weights = hash_vector(index_terms(record['parsed_data'] or {}))
+            vectors.append((str(record['_id']), indices, weights))
+        if not vectors:
+            return
+        with self._lock:
+            for analysis_id, indices, weights in vectors:
+                self._apply(analysis_id, indices, weights)
+            self.log.append(
+                {'_id': analysis_id, 'i': indices.tolist(), 'w': weights.tolist()}
+                for analysis_id, indices, weights in vectors
+            )
+
+    def rebuild(self, records):
+        with self._lock:
+            self.log.rewrite([])
+            self._reset()
+        self.add(records)
+
+    def _refresh(self):
+        # Smoothed IDF for the current corpus, then every vector scaled by it,
+        # divided by its row norm and sorted by column
+        self._merge()
+        self._pending_docs = 0
+        count = len(self.ids)
+        self._idf = np.log((1 + count) / (1 + self.doc_freq)) + 1
+        scaled = self._weights * self._idf[self._columns]
+        norms = np.sqrt(np.bincount(self._rows, weights=scaled ** 2, minlength=count))
+        order = np.argsort(self._columns, kind='stable')
+        self._matrix_rows = self._rows[order]
+        self._matrix_weights = (scaled / norms[self._rows])[order]
+        self._column_ptr = np.searchsorted(self._columns[order], np.arange(HASH_DIMENSIONS + 1))
+
+    def _score_matrix(self, columns, values, count):
+        # Sparse matrix-vector product over the refreshed matrix, reading
+        # only the given columns
+        starts = self._column_ptr[columns]
+        lengths = self._column_ptr[columns + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(count)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        return np.bincount(
+            self._matrix_rows[offsets],
+            weights=self._matrix_weights[offsets] * np.repeat(values, lengths),
+            minlength=count
+        )
+
+    def _score_pending(self, query, count):
+        # Vectors added since the refresh, normalised with the same IDF
+        rows, columns, weights = (np.concatenate(parts) for parts in zip(*self._pending))
+        scaled = weights * self._idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=scaled ** 2, minlength=count))
+        scores = np.bincount(rows, weights=scaled * query[columns], minlength=count)
+        return np.divide(scores, norms, out=np.zeros(count), where=norms > 0)
+
+    def match(self, job_description, top_k=10):
+        # Returns the top_k resumes by cosine similarity of TF-IDF vectors
+        started = time.perf_counter()
+        skills = default_matcher().match(job_description)
+        indices, weights = hash_vector(index_terms({'text': job_description, 'skill_counts': skills}))
+        with self._lock:
+            count = len(self.ids)
+            if self._idf is None or self._pending_docs > REFRESH_FRACTION * count:
+                self._refresh()
+            values = weights * self._idf[indices]
+            query_norm = np.linalg.norm(values)
+            results = []
+            if count and query_norm:
+                values /= query_norm
+                scores = self._score_matrix(indices, values, count)
+                if self._pending:
+                    query = np.zeros(HASH_DIMENSIONS)
+                    query[indices] = values
+                    scores += self._score_pending(query, count)
+                top_k = min(top_k, count)
+                top = np.argpartition(-scores, top_k - 1)[:top_k]
+                top = top[np.argsort(-scores[top], kind='stable')]
+                results = [
+                    {'_id': self.ids[doc], 'similarity': round(float(scores[doc]), 4)}
+                    for doc in top.tolist() if scores[doc] > 0
+                ]
+        return {
+            'results': results,
+            'skills': list(skills),
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+def attach_match_index(db, path=None, lazy=False):
+    # Loads the vectors, rebuilds them when they do not cover every stored
+    # analysis, and keeps them current through the storage listeners. With
+    # lazy, the load is deferred until the index is first used.
+    # Records saved after this point reach the index through the listener,
+    # so the load compares it with the count at attach time.
+    stored = db.count_analyses()
+    def load():
+        index = MatchIndex(path or os.getenv('MATCH_INDEX_PATH', DEFAULT_VECTOR_PATH))
+        if len(index) != stored:
+            index.rebuild(iter_analyses(db, {'parsed_data.text': 1, 'parsed_data.skills': 1, 'parsed_data.skill_counts': 1, 'created_at': 1}))
+        return index
+    index = LazyIndex('match', load) if lazy else load()
+    db.listeners.append(index.add)
+    return index
@@ -0,0 +1,83 @@
+import base64
+import json
+
+# Listing projection that leaves out the raw resume text
+SUMMARY_PROJECTION = {'parsed_data.text': 0}
+
+def encode_cursor(created_at, analysis_id):
+    raw = json.dumps([str(created_at), str(analysis_id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        created_at, analysis_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(analysis_id, str):
+        raise ValueError('Invalid cursor')
+    return created_at, analysis_id
+
+def iter_analyses(db, projection=None, page_size=500, cursor=None):
+    # Every stored analysis (after cursor), newest first, read a page at a time
+    while True:
+        page = db.get_analyses_page(limit=page_size, cursor=cursor, projection=projection)
+        yield from page['analyses']
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+def includes_path(projection, path):
+    # Whether a projection keeps the field at a dotted path
+    if not projection:
+        return True
+    parts = path.split('.')
+    paths = ['.'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+    if any(projection.values()):
+        return any(projection.get(prefix) for prefix in paths)
+    return not any(prefix in projection for prefix in paths)
+
+def apply_projection(doc, projection):
+    # Mongo-style projection: either all inclusions ({'path': 1}) or all
+    # exclusions ({'path': 0}), with dotted paths into nested dicts. The
+    # document is modified in place for exclusions.
+    if not projection:
+        return doc
+
+    if any(projection.values()):
+        result = {}
+        if projection.get('_id', 1) and '_id' in doc:
+            result['_id'] = doc['_id']
+        for path, flag in projection.items():
+            if not flag or path == '_id':
+                continue
+            parts = path.split('.')
+            src, dst = doc, result
+            for part in parts[:-1]:
+                if not isinstance(src, dict) or part not in src:
+                    break
+                src = src[part]
+                dst = dst.setdefault(part, {})
+            else:
+                if isinstance(src, dict) and parts[-1] in src:
+                    dst[parts[-1]] = src[parts[-1]]
+        return result
+
+    for path in projection:
+        parts = path.split('.')
+        target = doc
+        for part in parts[:-1]:
+            target = target.get(part) if isinstance(target, dict) else None
+        if isinstance(target, dict):
+            target.pop(parts[-1], None)
+    return doc
+
+def parse_fields(fields):
+    # Maps the ?fields= query parameter to a projection
+    if not fields or fields == 'summary':
+        return SUMMARY_PROJECTION
+    if fields == 'full':
+        return None
+    projection = {field.strip(): 1 for field in fields.split(',') if field.strip()}
+    # The pagination cursor is built from created_at
+    projection['created_at'] = 1
+    return projection
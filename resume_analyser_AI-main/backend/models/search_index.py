@@ -0,0 +1,267 @@
+import math
+import os
+import re
+import shlex
+import threading
+import time
+from array import array
+from collections import Counter
+import numpy as np
+from models.index_log import IndexLog
+from models.lazy_index import LazyIndex
+from models.query import iter_analyses
+from utils.skill_matcher import WORD_RE
+
+# Numeric fields that can be filtered on, and where they live in a record
+NUMERIC_FIELDS = {
+    'overall_score': ('analysis', 'overall_score'),
+    'technical_score': ('analysis', 'detailed_scores', 'technical_score'),
+    'experience_score': ('analysis', 'detailed_scores', 'experience_score'),
+    'education_score': ('analysis', 'detailed_scores', 'education_score'),
+    'completeness_score': ('analysis', 'detailed_scores', 'completeness_score')
+}
+FIELD_ALIASES = {'score': 'overall_score'}
+FILTER_RE = re.compile(r'(\w+)(>=|<=|>|<|=)(-?\d+(?:\.\d+)?)')
+OPERATOR_SPACING_RE = re.compile(r'\s*(>=|<=|>|<|=)\s*')
+COMPARATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '=': np.equal
+}
+SKILL_PREFIX = 'skill:'
+# Next to the SimpleStorage segments
+DEFAULT_INDEX_PATH = os.path.join('analyses_store', 'search_index.jsonl')
+
+def _lookup(record, path):
+    value = record
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def index_terms(parsed_data):
+    # Term frequencies for a record: lowercased words of the resume text,
+    # plus one 'skill:<name>' term per canonical skill
+    terms = Counter(word.lower() for word in WORD_RE.findall(parsed_data.get('text') or ''))
+    skill_counts = parsed_data.get('skill_counts') or {skill: 1 for skill in parsed_data.get('skills') or []}
+    for skill, count in skill_counts.items():
+        terms[SKILL_PREFIX + skill.lower()] += count
+    return dict(terms)
+
+def index_numbers(record):
+    return {field: _lookup(record, path) for field, path in NUMERIC_FIELDS.items()}
+
+class SearchIndex:
+    # Inverted index over stored analyses. Each record gets a small document
+    # number; postings map a term to {doc: term frequency} and numeric fields
+    # are flat float arrays indexed by doc (nan when missing), so filters are
+    # a vectorized comparison. Changes are appended to a JSON lines log that
+    # is replayed on start and rewritten once most of it is superseded.
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.log = IndexLog(path)
+        self.ids = []
+        self.docs = {}
+        self.postings = {}
+        self.doc_terms = []
+        self.numbers = {field: array('d') for field in NUMERIC_FIELDS}
+        self._lock = threading.Lock()
+        self._log_entries = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _load(self):
+        for entry in self.log.read():
+            self._apply(entry)
+            self._log_entries += 1
+        if self._log_entries > 2 * len(self.ids) + 1000:
+            self._rewrite()
+
+    def _doc(self, analysis_id):
+        doc = self.docs.get(analysis_id)
+        if doc is None:
+            doc = self.docs[analysis_id] = len(self.ids)
+            self.ids.append(analysis_id)
+            self.doc_terms.append({})
+            for values in self.numbers.values():
+                values.append(math.nan)
+        return doc
+
+    def _apply(self, entry):
+        doc = self._doc(entry['_id'])
+        if 'terms' in entry:
+            postings = self.postings
+            for term in self.doc_terms[doc]:
+                del postings[term][doc]
+            for term, count in entry['terms'].items():
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    term_postings = postings[term] = {}
+                term_postings[doc] = count
+            self.doc_terms[doc] = entry['terms']
+        for field, value in entry.get('numbers', {}).items():
+            if field in self.numbers:
+                self.numbers[field][doc] = math.nan if value is None else value
+
+    def _entry(self, record):
+        # Only the parts present in the record are replaced, so an update that
+        # carries just a new analysis keeps the existing terms
+        entry = {'_id': str(record['_id'])}
+        if 'parsed_data' in record:
+            entry['terms'] = index_terms(record['parsed_data'] or {})
+        if 'analysis' in record:
+            entry['numbers'] = index_numbers(record)
+        return entry
+
+    def add(self, records):
+        # Indexes new records or re-indexes changed ones; usable as a storage
+        # listener
+        entries = [self._entry(record) for record in records]
+        with self._lock:
+            for entry in entries:
+                self._apply(entry)
+            self.log.append(entries)
+            self._log_entries += len(entries)
+
+    def rebuild(self, records):
+        # Replaces the whole index with the given records
+        with self._lock:
+            self.ids = []
+            self.docs = {}
+            self.postings = {}
+            self.doc_terms = []
+            self.numbers = {field: array('d') for field in NUMERIC_FIELDS}
+            for record in records:
+                self._apply(self._entry(record))
+            self._rewrite()
+
+    def _rewrite(self):
+        self.log.rewrite(
+            {
+                '_id': analysis_id,
+                'terms': self.doc_terms[doc],
+                'numbers': {field: None if math.isnan(values[doc]) else values[doc] for field, values in self.numbers.items()}
+            }
+            for doc, analysis_id in enumerate(self.ids)
+        )
+        self._log_entries = len(self.ids)
+
+    def parse_query(self, query):
+        # Words are ANDed; "a OR b" makes one clause of alternatives. A bare
+        # word matches the resume text or a skill of that name, "skill:name"
+        # only the skill, and field>value (>=, <, <=, =) filters on a score.
+        # Raises ValueError on a malformed query.
+        try:
+            # "overall_score > 70" is read as "overall_score>70"
+            tokens = shlex.split(OPERATOR_SPACING_RE.sub(r'\1', query or ''))
+        except ValueError:
+            raise ValueError('Unbalanced quotes in query')
+        clauses = []
+        filters = []
+        join_next = False
+        for token in tokens:
+            if token in ('AND', 'OR'):
+                join_next = token == 'OR' and bool(clauses)
+                continue
+            match = FILTER_RE.fullmatch(token)
+            if match:
+                field = FIELD_ALIASES.get(match.group(1), match.group(1))
+                if field not in NUMERIC_FIELDS:
+                    raise ValueError(f'Unknown field: {match.group(1)}')
+                filters.append((field, match.group(2), float(match.group(3))))
+                join_next = False
+                continue
+            if token.lower().startswith(SKILL_PREFIX):
+                alternatives = [[SKILL_PREFIX + token[len(SKILL_PREFIX):].strip().lower()]]
+            else:
+                words = [word.lower() for word in WORD_RE.findall(token)]
+                if not words:
+                    continue
+                # A quoted phrase requires every word, or the skill as a whole
+                alternatives = [words, [SKILL_PREFIX + ' '.join(words)]]
+            if join_next:
+                clauses[-1].extend(alternatives)
+            else:
+                clauses.append(alternatives)
+            join_next = False
+        return clauses, filters
+
+    def _clause_docs(self, alternatives):
+        # Docs matching any alternative; each alternative needs all its terms
+        docs = set()
+        for terms in alternatives:
+            postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+            matched = set(postings[0])
+            for other in postings[1:]:
+                matched.intersection_update(other)
+            docs |= matched
+        return docs
+
+    def search(self, query, limit=20):
+        # Returns ranked ids: by summed tf-idf weight of the matched terms,
+        # then by overall score
+        started = time.perf_counter()
+        clauses, filters = self.parse_query(query)
+        with self._lock:
+            count = len(self.ids)
+            candidates = None
+            for alternatives in sorted(clauses, key=lambda alternatives: sum(
+                    min(len(self.postings.get(term, {})) for term in terms) for terms in alternatives)):
+                docs = self._clause_docs(alternatives)
+                candidates = docs if candidates is None else candidates & docs
+                if not candidates:
+                    break
+
+            mask = np.ones(count, dtype=bool)
+            for field, op, value in filters:
+                mask &= COMPARATORS[op](np.frombuffer(self.numbers[field], dtype=float, count=count), value)
+            if candidates is None:
+                matched = np.flatnonzero(mask)
+            else:
+                matched = np.array(sorted(doc for doc in candidates if mask[doc]), dtype=np.int64)
+
+            terms = {term for alternatives in clauses for group in alternatives for term in group}
+            idf = {term: math.log(1 + count / len(self.postings[term])) for term in terms if self.postings.get(term)}
+            relevance = np.zeros(len(matched))
+            for term, weight in idf.items():
+                postings = self.postings[term]
+                tf = np.array([postings.get(doc, 0) for doc in matched.tolist()], dtype=float)
+                relevance += weight * tf / (tf + 1.2)
+            overall = np.frombuffer(self.numbers['overall_score'], dtype=float, count=count)[matched]
+            # Ties on relevance go to the higher overall score; missing scores last
+            order = np.lexsort((-np.nan_to_num(overall, nan=-1.0), -relevance))[:limit]
+            results = [
+                {
+                    '_id': self.ids[matched[i]],
+                    'relevance': round(float(relevance[i]), 4),
+                    'overall_score': None if math.isnan(overall[i]) else float(overall[i])
+                }
+                for i in order.tolist()
+            ]
+            total = len(matched)
+        return {
+            'results': results,
+            'total': total,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+def attach_search_index(db, path=None, lazy=False):
+    # Loads the index, rebuilds it from storage when it does not cover every
+    # stored analysis, and keeps it current through the storage listeners.
+    # With lazy, the load is deferred until the index is first used.
+    # Records saved after this point reach the index through the listener,
+    # so the load compares it with the count at attach time.
+    stored = db.count_analyses()
+    def load():
+        index = SearchIndex(path or os.getenv('SEARCH_INDEX_PATH', DEFAULT_INDEX_PATH))
+        if len(index) != stored:
+            index.rebuild(iter_analyses(db, {'parsed_data': 1, 'analysis': 1, 'created_at': 1}))
+        return index
+    index = LazyIndex('search', load) if lazy else load()
+    db.listeners.append(index.add)
+    return index
@@ -1,35 +1,689 @@
+import bisect
 import json
+import logging
 import os
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 import uuid
+from models.query import apply_projection, decode_cursor, encode_cursor, includes_path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Append-only analysis store: each analysis is one JSON line in the active
+# segment file, and an in-memory index maps _id to its location so writes never
+# rewrite history and lookups are a single seek. The index is snapshotted
+# to disk so opening the store only scans what was appended since.
+#
+# The raw resume text, most of each record, is kept apart: zlib-compressed
+# in append-only text files, with the record holding its (file, offset,
+# length) in _text. Listings and scans that leave the text out of their
+# projection never read or decompress it.
+#
+# Several worker processes can share one store. Appends, compaction and
+# snapshots happen under an exclusive lock on a lock file, and each process
+# picks up the others' appends by scanning the segment tails past what it
+# has indexed before it reads or writes.
 class SimpleStorage:
-    def __init__(self):
-        self.data_file = 'analyses.json'
-        self.data = self._load_data()
-    
-    def _load_data(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        return []
-    
-    def _save_data(self):
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, default=str, indent=2)
-    
+    SEGMENT_PREFIX = 'segment-'
+    SEGMENT_SUFFIX = '.jsonl'
+    TEXT_PREFIX = 'text-'
+    TEXT_SUFFIX = '.zlib'
+    SNAPSHOT_FILE = 'index-snapshot.json'
+    LOCK_FILE = 'store.lock'
+
+    def __init__(self, data_dir='analyses_store', legacy_file='analyses.json', segment_size=16 * 1024 * 1024,
+                 snapshot_bytes=4 * 1024 * 1024):
+        self.data_dir = data_dir
+        self.legacy_file = legacy_file
+        self.segment_size = segment_size
+        # Bytes appended after the last snapshot that trigger a new one
+        self.snapshot_bytes = snapshot_bytes
+        # Called with the saved or updated records after each write, and with
+        # records other processes wrote once they are picked up
+        self.listeners = []
+        # Guards the in-memory index and the open files
+        self._lock = threading.RLock()
+        # Serialises writing threads; only its holder takes the file lock
+        self._commit_lock = threading.Lock()
+        # Batches of records waiting for a group commit, and whether a thread
+        # is writing one
+        self._queue = []
+        self._queue_changed = threading.Condition()
+        self._committing = False
+        self._readers = {}
+        self._writer = None
+        self._writer_segment = None
+        self._text_readers = {}
+        self._text_writer = None
+        self._text_segment = None
+        # End of the newest text file; None until found under the file lock
+        self._text_end = None
+        # Record lines appended to the active segment but not yet written
+        self._pending_lines = []
+        # Records caught up on mid-read, for the next refresh to pass on
+        self._unnotified = []
+        self._reset()
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._lock_file = open(os.path.join(self.data_dir, self.LOCK_FILE), 'a+b')
+        with self._commit_lock, self._file_lock():
+            self._recover()
+            if not self.index and os.path.exists(self.legacy_file):
+                self._import_legacy()
+
+    def _reset(self):
+        # _id -> (segment number, byte offset, byte length)
+        self.index = {}
+        # (created_at, _id) pairs kept sorted oldest first for listing
+        self.order = []
+        self.live_bytes = 0
+        self.dead_bytes = 0
+        # segment number -> bytes indexed so far
+        self._positions = {}
+        self._active_segment = 1
+        self._unsnapshotted = 0
+        self._pending_lines = []
+        self._close_files()
+
+    def _close_files(self):
+        with self._lock:
+            for reader in list(self._readers.values()) + list(self._text_readers.values()):
+                reader.close()
+            self._readers = {}
+            self._text_readers = {}
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                self._writer_segment = None
+            if self._text_writer is not None:
+                self._text_writer.close()
+                self._text_writer = None
+                self._text_segment = None
+
+    def close(self):
+        self._close_files()
+        self._lock_file.close()
+
+    @contextmanager
+    def _file_lock(self):
+        # Exclusive across processes. Callers hold _commit_lock, since the
+        # threads of one process share the lock file descriptor.
+        if fcntl:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _segment_path(self, number):
+        return os.path.join(self.data_dir, f'{self.SEGMENT_PREFIX}{number:06d}{self.SEGMENT_SUFFIX}')
+
+    def _text_path(self, number):
+        return os.path.join(self.data_dir, f'{self.TEXT_PREFIX}{number:06d}{self.TEXT_SUFFIX}')
+
+    def _file_numbers(self, prefix, suffix):
+        numbers = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith(prefix) and name.endswith(suffix):
+                numbers.append(int(name[len(prefix):-len(suffix)]))
+        return sorted(numbers)
+
+    def _segment_numbers(self):
+        return self._file_numbers(self.SEGMENT_PREFIX, self.SEGMENT_SUFFIX)
+
+    def _recover(self):
+        # Rebuild the index from the snapshot, then by scanning what was
+        # appended after it (every segment without one) in write order
+        with self._lock:
+            numbers = self._segment_numbers()
+            self._load_snapshot(numbers)
+            self._scan(numbers)
+            # Drop a torn write left behind by a crash mid-append
+            self._truncate_torn()
+            if self._unsnapshotted >= self.snapshot_bytes:
+                self._save_snapshot()
+
+    def _scan(self, numbers):
+        # Indexes the complete lines past the indexed end of each segment and
+        # returns their records. Lines are only ever added at the end, so a
+        # line still being written by another process is picked up next time.
+        records = []
+        text_sizes = {}
+        for number in numbers:
+            start = offset = self._positions.get(number, 0)
+            try:
+                f = open(self._segment_path(number), 'rb')
+            except FileNotFoundError:
+                continue
+            with f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                        analysis_id = record['_id']
+                    except (ValueError, KeyError, TypeError):
+                        # A complete line is never rewritten, so skipping it
+                        # keeps the records after it
+                        logger.warning('Skipping corrupt record in %s at byte %d', self._segment_path(number), offset)
+                        offset += len(line)
+                        continue
+                    if not self._text_on_disk(record.get('_text'), text_sizes):
+                        # Its text was lost with the tail of a text file
+                        logger.warning('Skipping record in %s at byte %d whose text is missing', self._segment_path(number), offset)
+                        offset += len(line)
+                        continue
+                    self._index_record(analysis_id, record.get('created_at', ''), number, offset, len(line))
+                    records.append(record)
+                    offset += len(line)
+            self._positions[number] = offset
+            self._unsnapshotted += offset - start
+            self._active_segment = max(self._active_segment, number)
+        return records
+
+    def _text_on_disk(self, location, sizes):
+        # Whether the text a record refers to lies within its text file.
+        # sizes caches the file sizes for one scan; other processes may
+        # append while it runs, so a cached size that falls short is checked
+        # again.
+        if location is None:
+            return True
+        number, offset, length = location
+        if offset + length > sizes.get(number, -1):
+            try:
+                sizes[number] = os.path.getsize(self._text_path(number))
+            except OSError:
+                sizes[number] = 0
+        return offset + length <= sizes[number]
+
+    def _catch_up(self):
+        # Picks up what other processes appended since the last look and
+        # returns those records. If another process compacted the store, the
+        # segments this index points into are gone and it is reloaded; the
+        # records returned are then the ones this process had not seen. A
+        # look taken mid-compaction sees the new segments as appended ones,
+        # so the oldest segment going missing also counts: compaction removes
+        # the old segments oldest first.
+        with self._lock:
+            active = self._active_segment
+            try:
+                size = os.path.getsize(self._segment_path(active))
+                compacted = bool(self._positions) and not os.path.exists(self._segment_path(min(self._positions)))
+            except FileNotFoundError:
+                compacted = bool(self._positions)
+                if not compacted:
+                    return []
+            if compacted:
+                known = self.index
+                self._reset()
+                numbers = self._segment_numbers()
+                self._load_snapshot(numbers)
+                self._scan(numbers)
+                return [self._read(location) for analysis_id, location in self.index.items() if analysis_id not in known]
+            # The active segment is scanned again whenever a newer one exists:
+            # it may have grown after its size was taken, before the rotation
+            numbers = [active]
+            while os.path.exists(self._segment_path(active + 1)):
+                active += 1
+                numbers.append(active)
+            if len(numbers) == 1 and size <= self._positions.get(active, 0):
+                return []
+            return self._scan(numbers)
+
+    def refresh(self):
+        # Picks up other processes' appends and passes them to the listeners;
+        # for callers that read an index fed by the listeners, not storage
+        with self._lock:
+            records = self._unnotified + self._catch_up()
+            self._unnotified = []
+        self._notify_caught_up(records)
+
+    def _notify_caught_up(self, records):
+        # Listeners get the records as saved, with their text
+        if records:
+            self._notify([self._inflate(record) for record in records])
+
+    def _truncate_torn(self):
+        # Under the file lock nobody else is writing, so a last line of the
+        # active segment without its newline is left over from a crash
+        # mid-append. Only that line is cut: complete lines are records,
+        # whether or not this process has indexed them.
+        try:
+            f = open(self._segment_path(self._active_segment), 'r+b')
+        except FileNotFoundError:
+            return
+        with f:
+            size = end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(end - 64 * 1024, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                logger.warning('Truncating %d bytes of a torn write in %s', size - end, f.name)
+                f.truncate(end)
+
+    @contextmanager
+    def _rebuild_on_error(self):
+        # For writes under the file lock. One that fails partway can leave
+        # the index and positions ahead of what reached the disk, and the next
+        # write would then land on or cut other processes' appends, so the
+        # in-memory state is rebuilt from the files before the error goes on.
+        # Lines that did reach a segment are kept.
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                try:
+                    self._close_files()
+                except OSError:
+                    pass
+                self._reset()
+                self._recover()
+            raise
+
+    def _load_snapshot(self, numbers):
+        # Restores the index from the snapshot, unless there is none or it no
+        # longer matches the segments on disk
+        try:
+            with open(os.path.join(self.data_dir, self.SNAPSHOT_FILE), 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        covered = {int(number): size for number, size in snapshot['segments'].items()}
+        for number in numbers:
+            if number in covered:
+                if os.path.getsize(self._segment_path(number)) < covered[number]:
+                    return
+            elif covered and number < max(covered):
+                return
+        if any(number not in numbers for number in covered):
+            return
+
+        # Entries are stored in listing order: created_at, _id, location
+        entries = snapshot['entries']
+        self.order = [(created_at, analysis_id) for created_at, analysis_id, *_ in entries]
+        self.index = {analysis_id: tuple(location) for _, analysis_id, *location in entries}
+        self.live_bytes = sum(location[2] for location in self.index.values())
+        self.dead_bytes = snapshot['dead_bytes']
+        self._positions = covered
+        if covered:
+            self._active_segment = max(covered)
+
+    def _save_snapshot(self):
+        # Taken under the file lock after a sync, so it covers exactly the
+        # indexed bytes, all of which are on disk
+        snapshot = {
+            'segments': self._positions,
+            'dead_bytes': self.dead_bytes,
+            'entries': [[created_at, analysis_id, *self.index[analysis_id]] for created_at, analysis_id in self.order]
+        }
+        path = os.path.join(self.data_dir, self.SNAPSHOT_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+        self._unsnapshotted = 0
+
+    def _import_legacy(self):
+        with open(self.legacy_file, 'r') as f:
+            records = json.load(f)
+        for record in records:
+            record.setdefault('_id', str(uuid.uuid4()))
+        self._append_all(records)
+
+    def _index_record(self, analysis_id, created_at, segment, offset, length):
+        previous = self.index.get(analysis_id)
+        if previous:
+            self.live_bytes -= previous[2]
+            self.dead_bytes += previous[2]
+        else:
+            bisect.insort(self.order, (created_at, analysis_id))
+        self.index[analysis_id] = (segment, offset, length)
+        self.live_bytes += length
+
+    def _open_writer(self):
+        if self._writer_segment != self._active_segment:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = open(self._segment_path(self._active_segment), 'ab')
+            self._writer_segment = self._active_segment
+        return self._writer
+
+    def _rotate_if_needed(self):
+        if self._positions.get(self._active_segment, 0) >= self.segment_size:
+            self._sync_text()
+            self._sync()
+            self._active_segment += 1
+
+    def _open_text_writer(self):
+        # Called under the file lock. The first call of a write finds the
+        # newest text file and its end, which other processes may have moved;
+        # text files rotate at segment_size like the segments.
+        if self._text_end is None:
+            numbers = self._file_numbers(self.TEXT_PREFIX, self.TEXT_SUFFIX)
+            number = numbers[-1] if numbers else 1
+            self._text_end = os.path.getsize(self._text_path(number)) if numbers else 0
+            if self._text_end >= self.segment_size:
+                number += 1
+                self._text_end = 0
+        elif self._text_end >= self.segment_size:
+            self._sync_text()
+            number = self._text_segment + 1
+            self._text_end = 0
+        else:
+            number = self._text_segment
+        if number != self._text_segment:
+            if self._text_writer is not None:
+                self._text_writer.close()
+            self._text_writer = open(self._text_path(number), 'ab')
+            self._text_segment = number
+        return self._text_writer
+
+    def _append_text(self, text):
+        writer = self._open_text_writer()
+        blob = zlib.compress(text.encode('utf-8'))
+        offset = self._text_end
+        writer.write(blob)
+        self._text_end += len(blob)
+        return [self._text_segment, offset, len(blob)]
+
+    def _sync_text(self):
+        if self._text_writer is not None:
+            self._text_writer.flush()
+            os.fsync(self._text_writer.fileno())
+
+    def _append(self, data):
+        # New text goes to the text files; records read back for an update or
+        # compaction already carry their _text reference
+        parsed_data = data.get('parsed_data')
+        if isinstance(parsed_data, dict) and isinstance(parsed_data.get('text'), str):
+            data = dict(
+                data,
+                parsed_data={key: value for key, value in parsed_data.items() if key != 'text'},
+                _text=self._append_text(parsed_data['text'])
+            )
+        self._rotate_if_needed()
+        # Opened now so the segment exists for other threads' catch-ups
+        self._open_writer()
+        line = (json.dumps(data, default=str, separators=(',', ':')) + '\n').encode('utf-8')
+        offset = self._positions.get(self._active_segment, 0)
+        self._pending_lines.append(line)
+        self._positions[self._active_segment] = offset + len(line)
+        self._unsnapshotted += len(line)
+        self._index_record(data['_id'], data.get('created_at', ''), self._active_segment, offset, len(line))
+
+    def _write_lines(self):
+        # Record lines are held back until the text they refer to has left
+        # its buffer, so no line reaches a segment ahead of its text
+        if self._pending_lines:
+            if self._text_writer is not None:
+                self._text_writer.flush()
+            self._open_writer().write(b''.join(self._pending_lines))
+            self._pending_lines = []
+
+    def _sync(self):
+        self._write_lines()
+        if self._writer is not None:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+
+    def _append_all(self, records, updates=()):
+        # Runs under the file lock, after a catch-up. Appends the records and
+        # the updated copies, syncs once, then compacts or snapshots when due.
+        # updates is a list of (_id, fields); returns the fields applied.
+        with self._rebuild_on_error():
+            return self._append_batch(records, updates)
+
+    def _append_batch(self, records, updates):
+        updated = []
+        with self._lock:
+            self._text_end = None
+            self._truncate_torn()
+            for data in records:
+                self._append(data)
+            for analysis_id, fields in updates:
+                location = self.index.get(analysis_id)
+                if location is None:
+                    continue
+                data = self._read(location)
+                data.update(fields)
+                self._append(data)
+                updated.append(dict(fields, _id=analysis_id))
+            if self._text_writer is not None:
+                self._text_writer.flush()
+            text_writer = self._text_writer
+        # Readers in this process carry on while the syncs run. The text is
+        # synced before any of the batch's lines is written, so a record on
+        # disk never refers to text that is not.
+        if text_writer is not None:
+            os.fsync(text_writer.fileno())
+        with self._lock:
+            self._write_lines()
+            if self._writer is not None:
+                self._writer.flush()
+            writer = self._writer
+        if writer is not None:
+            os.fsync(writer.fileno())
+        with self._lock:
+            if self.dead_bytes > self.segment_size and self.dead_bytes > self.live_bytes:
+                self._compact()
+            elif self._unsnapshotted >= self.snapshot_bytes:
+                self._save_snapshot()
+        return updated
+
+    def _commit(self, records):
+        # Group commit: callers queue their records while another thread is
+        # writing, and the next one to write takes every queued batch and
+        # syncs once, so concurrent saves share one disk flush instead of
+        # taking turns
+        batch = {'records': records, 'done': False, 'error': None}
+        with self._queue_changed:
+            self._queue.append(batch)
+            while self._committing and not batch['done']:
+                self._queue_changed.wait()
+            if not batch['done']:
+                self._committing = True
+                batches, self._queue = self._queue, []
+        if not batch['done']:
+            caught_up = []
+            try:
+                with self._commit_lock, self._file_lock():
+                    caught_up = self._catch_up()
+                    self._append_all([data for queued in batches for data in queued['records']])
+            except Exception as e:
+                for queued in batches:
+                    queued['error'] = e
+            with self._queue_changed:
+                for queued in batches:
+                    queued['done'] = True
+                self._committing = False
+                self._queue_changed.notify_all()
+            self._notify_caught_up(caught_up)
+        if batch['error'] is not None:
+            raise batch['error']
+
+    def _read(self, location):
+        segment, offset, length = location
+        # Readers are shared, and indexes may load in background threads
+        with self._lock:
+            # Lines this process appended may still be held back or in the
+            # writer's buffer, e.g. an earlier update of the same record in
+            # one batch
+            if segment == self._active_segment:
+                self._write_lines()
+            if segment == self._writer_segment and self._writer is not None:
+                self._writer.flush()
+            reader = self._readers.get(segment)
+            if reader is None:
+                reader = self._readers[segment] = open(self._segment_path(segment), 'rb')
+            reader.seek(offset)
+            line = reader.read(length)
+        return json.loads(line)
+
+    def _read_text(self, location):
+        number, offset, length = location
+        with self._lock:
+            if number == self._text_segment and self._text_writer is not None:
+                self._text_writer.flush()
+            reader = self._text_readers.get(number)
+            if reader is None:
+                reader = self._text_readers[number] = open(self._text_path(number), 'rb')
+            reader.seek(offset)
+            blob = reader.read(length)
+        try:
+            return zlib.decompress(blob).decode('utf-8')
+        except (zlib.error, UnicodeDecodeError):
+            # Text lost with a torn tail, from before lines were held back
+            # for it; the record is still served, without its text
+            logger.warning('Unreadable text in %s at byte %d', self._text_path(number), offset)
+            return ''
+
+    def _inflate(self, record, with_text=True):
+        # Replaces the _text reference with the text itself, or drops it
+        location = record.pop('_text', None)
+        if location is not None and with_text:
+            record['parsed_data']['text'] = self._read_text(location)
+        return record
+
+    def _read_id(self, analysis_id, with_text=True):
+        # Another process may compact the store between the catch-up and the
+        # read; the retry reads from the compacted segments
+        with self._lock:
+            try:
+                record = self._read(self.index[analysis_id])
+            except FileNotFoundError:
+                self._unnotified.extend(self._catch_up())
+                record = self._read(self.index[analysis_id])
+        return self._inflate(record, with_text)
+
+    def _close_readers(self):
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+
     def save_analysis(self, data):
         data['_id'] = str(uuid.uuid4())
         data['created_at'] = datetime.utcnow().isoformat()
-        self.data.append(data)
-        self._save_data()
+        self._commit([data])
+        self._notify([data])
         return type('Result', (), {'inserted_id': data['_id']})()
-    
+
+    def save_analyses(self, records):
+        # Bulk insert: every record is appended and the segment is synced once
+        created_at = datetime.utcnow().isoformat()
+        for data in records:
+            data['_id'] = str(uuid.uuid4())
+            data['created_at'] = created_at
+        self._commit(records)
+        self._notify(records)
+        return type('Result', (), {'inserted_ids': [data['_id'] for data in records]})()
+
+    def update_analyses(self, updates):
+        # updates is a list of (_id, fields); each record is rewritten with
+        # those top-level fields replaced, keeping its _id and created_at,
+        # and the segment is synced once
+        with self._commit_lock, self._file_lock():
+            caught_up = self._catch_up()
+            updated = self._append_all([], updates)
+        self._notify_caught_up(caught_up)
+        self._notify(updated)
+        return type('Result', (), {'modified_count': len(updated)})()
+
+    def _notify(self, records):
+        for listener in self.listeners:
+            listener(records)
+
+    def count_analyses(self):
+        self.refresh()
+        return len(self.index)
+
+    def storage_stats(self):
+        self.refresh()
+        return {
+            'records': len(self.index),
+            'live_bytes': self.live_bytes,
+            'dead_bytes': self.dead_bytes,
+            'segments': len(self._positions),
+            'text_bytes': sum(
+                os.path.getsize(self._text_path(number))
+                for number in self._file_numbers(self.TEXT_PREFIX, self.TEXT_SUFFIX)
+            )
+        }
+
     def get_analysis(self, analysis_id):
-        for item in self.data:
-            if item['_id'] == analysis_id:
-                return item
-        return None
-    
+        self.refresh()
+        if analysis_id not in self.index:
+            return None
+        return self._read_id(analysis_id)
+
     def get_all_analyses(self):
-        return sorted(self.data, key=lambda x: x['created_at'], reverse=True)
\ No newline at end of file
+        self.refresh()
+        with self._lock:
+            return [self._read_id(analysis_id) for _, analysis_id in reversed(self.order)]
+
+    def get_analyses_page(self, limit=20, cursor=None, projection=None):
+        # Newest first; the cursor is the (created_at, _id) of the last item
+        # returned, so each page is a bisect plus `limit` reads.
+        self.refresh()
+        with self._lock:
+            end = len(self.order)
+            if cursor:
+                end = bisect.bisect_left(self.order, decode_cursor(cursor))
+            start = max(end - limit, 0)
+            keys = self.order[start:end][::-1]
+            with_text = includes_path(projection, 'parsed_data.text')
+            records = [self._read_id(analysis_id, with_text) for _, analysis_id in keys]
+        analyses = [apply_projection(record, projection) for record in records]
+        next_cursor = encode_cursor(*keys[-1]) if keys and start > 0 else None
+        return {'analyses': analyses, 'next_cursor': next_cursor}
+
+    def compact(self):
+        with self._commit_lock, self._file_lock():
+            caught_up = self._catch_up()
+            with self._lock, self._rebuild_on_error():
+                self._compact()
+        self._notify_caught_up(caught_up)
+
+    def _compact(self):
+        # Copy live records into fresh segments, then drop the old ones. A crash
+        # before the old segments are removed only leaves duplicate copies,
+        # which recovery resolves in favour of the newer segment. Other
+        # processes notice their segments are gone and reload. Text files are
+        # kept: updates reuse the text they refer to, so little of it is dead.
+        old_segments = sorted(self._positions)
+        old_index = self.index
+
+        self._active_segment = (old_segments[-1] if old_segments else 0) + 1
+        self.index = {}
+        self.order = []
+        self.live_bytes = 0
+        self.dead_bytes = 0
+        self._positions = {}
+        for location in old_index.values():
+            self._append(self._read(location))
+        self._sync()
+
+        self._close_readers()
+        for number in old_segments:
+            os.remove(self._segment_path(number))
+        self._save_snapshot()
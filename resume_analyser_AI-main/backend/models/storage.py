@@ -0,0 +1,15 @@
+import os
+
+STORAGE_BACKENDS = ('local', 'mongo')
+
+def open_storage(backend=None):
+    # STORAGE_BACKEND picks the local segment store (the default) or MongoDB;
+    # only the chosen backend's module is imported
+    backend = backend or os.getenv('STORAGE_BACKEND', 'local')
+    if backend == 'mongo':
+        from models.database import Database
+        return Database()
+    if backend == 'local':
+        from models.simple_storage import SimpleStorage
+        return SimpleStorage()
+    raise ValueError(f'Unknown storage backend: {backend}')
@@ -1,7 +1,32 @@
 import re
 from datetime import datetime
+import numpy as np
+from utils import extraction
+
+CGPA_RE = re.compile(r'cgpa[:\s]*([0-9]\.[0-9]{1,2})')
+PERCENTAGE_RE = re.compile(r'percentage[:\s]*([0-9]{1,2}\.[0-9]{1,2})|([0-9]{1,2})%')
+
+# Checked in order; the first group with a word in the education text scores
+DEGREE_BONUSES = [
+    (('phd', 'doctorate'), 20),
+    (('master', 'mba', 'm.tech'), 15),
+    (('bachelor', 'b.tech', 'degree'), 10)
+]
+WEIGHT_NAMES = ['technical', 'experience', 'education', 'completeness']
+REQUIRED_FIELDS = ['email', 'phone', 'skills', 'education']
+# Recommendation for a technical, experience, education or completeness score
+# below its threshold, in that order
+RECOMMENDATIONS = [
+    "Add more technical skills relevant to your field",
+    "Highlight more work experience and achievements",
+    "Include educational background and certifications",
+    "Complete missing contact information"
+]
 
 class ProfileAnalyzer:
+    # Bump when scoring rules change so cached results are not reused
+    VERSION = 1
+
     def __init__(self):
         self.skill_weights = {
             'technical': 0.4,
@@ -31,6 +56,89 @@ class ProfileAnalyzer:
             'recommendations': self._generate_recommendations(scores, parsed_data)
         }
     
+    def analyze_batch(self, records):
+        # Scores many parsed_data dicts at once. Text features are still read
+        # per record, but the thresholds, caps and weighting run as array
+        # operations; results are equal to analyze_resume on each record.
+        features = [self._batch_features(parsed_data) for parsed_data in records]
+        if not features:
+            return []
+        skill_counts, years, has_education, multiple_entries, cgpa, percentage, degree_bonus, present_fields = (
+            np.array(column, dtype=float) for column in zip(*features)
+        )
+        has_education = has_education.astype(bool)
+        multiple_entries = multiple_entries.astype(bool)
+
+        technical = np.minimum(skill_counts * 10, 100)
+        experience = np.minimum(years * 10, 100)
+        has_cgpa = ~np.isnan(cgpa)
+        has_grade = has_cgpa | ~np.isnan(percentage)
+        grade_bonus = np.where(
+            has_cgpa,
+            np.select([cgpa >= 9.0, cgpa >= 8.0, cgpa >= 7.0], [25, 20, 15], 10),
+            np.select([percentage >= 85, percentage >= 75, percentage >= 65], [25, 20, 15], 10)
+        )
+        education_scores = np.where(
+            has_education,
+            np.minimum(30 + np.where(has_grade, grade_bonus, 0) + degree_bonus + np.where(has_grade & multiple_entries, 10, 0), 100),
+            20
+        )
+        completeness = present_fields / len(REQUIRED_FIELDS) * 100
+
+        # Columns are summed left to right, the same order as analyze_resume,
+        # so the float rounding (and round(..., 1)) matches exactly
+        scores = np.column_stack([technical, experience, education_scores, completeness])
+        weighted = scores * np.array([self.skill_weights[name] for name in WEIGHT_NAMES])
+        overall = weighted[:, 0] + weighted[:, 1] + weighted[:, 2] + weighted[:, 3]
+
+        recommendations = np.column_stack([technical < 50, experience < 50, education_scores < 50, completeness < 80])
+        results = []
+        for row in zip(overall.tolist(), technical.astype(int).tolist(), experience.astype(int).tolist(),
+                       education_scores.astype(int).tolist(), completeness.tolist(), recommendations.tolist()):
+            results.append({
+                'overall_score': round(row[0], 1),
+                'detailed_scores': {
+                    'technical_score': row[1],
+                    'experience_score': row[2],
+                    'education_score': row[3],
+                    'completeness_score': row[4]
+                },
+                'recommendations': [text for text, flagged in zip(RECOMMENDATIONS, row[5]) if flagged]
+            })
+        return results
+
+    def _batch_features(self, parsed_data):
+        education = parsed_data.get('education', [])
+        if education:
+            cgpa, percentage, degree_bonus = self._education_features(education)
+        else:
+            cgpa, percentage, degree_bonus = np.nan, np.nan, 0
+        return (
+            len(parsed_data.get('skills', []) or []),
+            sum(extraction.extract(parsed_data.get('text', '')).experience_years),
+            bool(education),
+            bool(education) and len(education) > 1,
+            cgpa,
+            percentage,
+            degree_bonus,
+            sum(1 for field in REQUIRED_FIELDS if parsed_data.get(field))
+        )
+
+    def _education_features(self, education):
+        # (cgpa, percentage, degree bonus) as _score_education reads them,
+        # with nan for a grade that is absent or not used
+        education_text = ' '.join(education).lower()
+        cgpa = percentage = np.nan
+        cgpa_matches = CGPA_RE.findall(education_text)
+        if cgpa_matches:
+            cgpa = float(cgpa_matches[0])
+        else:
+            match = PERCENTAGE_RE.search(education_text)
+            if match:
+                percentage = float(match.group(1) or match.group(2))
+        degree_bonus = next((bonus for words, bonus in DEGREE_BONUSES if any(word in education_text for word in words)), 0)
+        return cgpa, percentage, degree_bonus
+
     def analyze_linkedin(self, parsed_data):
         # Similar analysis for LinkedIn profiles
         return self.analyze_resume(parsed_data)
@@ -42,10 +150,8 @@ class ProfileAnalyzer:
         return min(len(skills) * 10, 100)
     
     def _score_experience(self, text):
-        # Count years of experience mentioned
-        years_pattern = r'(\d+)\s*(?:years?|yrs?)'
-        years = re.findall(years_pattern, text.lower())
-        total_years = sum(int(year) for year in years)
+        # Count years of experience mentioned; shares the parser's scan
+        total_years = sum(extraction.extract(text).experience_years)
         return min(total_years * 10, 100)
     
     def _score_education(self, education):
@@ -60,7 +166,7 @@ class ProfileAnalyzer:
         percentage_found = False
         
         # Check for CGPA
-        cgpa_matches = re.findall(r'cgpa[:\s]*([0-9]\.[0-9]{1,2})', education_text)
+        cgpa_matches = CGPA_RE.findall(education_text)
         if cgpa_matches:
             cgpa_found = True
             cgpa_value = float(cgpa_matches[0])
@@ -74,7 +180,7 @@ class ProfileAnalyzer:
                 score += 10
         
         # Check for Percentage
-        percentage_matches = re.findall(r'percentage[:\s]*([0-9]{1,2}\.[0-9]{1,2})|([0-9]{1,2})%', education_text)
+        percentage_matches = PERCENTAGE_RE.findall(education_text)
         if percentage_matches and not cgpa_found:
             percentage_found = True
             for match in percentage_matches:
@@ -90,12 +196,10 @@ class ProfileAnalyzer:
                 break
         
         # Degree level scoring
-        if any(word in education_text for word in ['phd', 'doctorate']):
-            score += 20
-        elif any(word in education_text for word in ['master', 'mba', 'm.tech']):
-            score += 15
-        elif any(word in education_text for word in ['bachelor', 'b.tech', 'degree']):
-            score += 10
+        for words, bonus in DEGREE_BONUSES:
+            if any(word in education_text for word in words):
+                score += bonus
+                break
         
         # Bonus for having both grades and degree info
         if (cgpa_found or percentage_found) and len(education) > 1:
@@ -104,23 +208,22 @@ class ProfileAnalyzer:
         return min(score, 100)
     
     def _score_completeness(self, data):
-        required_fields = ['email', 'phone', 'skills', 'education']
-        present_fields = sum(1 for field in required_fields if data.get(field))
-        return (present_fields / len(required_fields)) * 100
+        present_fields = sum(1 for field in REQUIRED_FIELDS if data.get(field))
+        return (present_fields / len(REQUIRED_FIELDS)) * 100
     
     def _generate_recommendations(self, scores, data):
         recommendations = []
         
         if scores['technical_score'] < 50:
-            recommendations.append("Add more technical skills relevant to your field")
+            recommendations.append(RECOMMENDATIONS[0])
         
         if scores['experience_score'] < 50:
-            recommendations.append("Highlight more work experience and achievements")
+            recommendations.append(RECOMMENDATIONS[1])
         
         if scores['education_score'] < 50:
-            recommendations.append("Include educational background and certifications")
+            recommendations.append(RECOMMENDATIONS[2])
         
         if scores['completeness_score'] < 80:
-            recommendations.append("Complete missing contact information")
+            recommendations.append(RECOMMENDATIONS[3])
         
         return recommendations
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from werkzeug.utils import secure_filename
+from services.extraction_pool import ExtractionError
+from services.pipeline import allowed_file, analyze_document, analyze_pages
+
+MAX_BATCH_FILES = 500
+MAX_FILE_BYTES = 10 * 1024 * 1024
+# Document bytes in one batch, counted uncompressed for ZIP members
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+
+class BatchTooLarge(Exception):
+    pass
+
+_executor = None
+_parser = None
+_analyzer = None
+
+def worker_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def get_executor(max_workers=None):
+    # max_workers only applies to the call that creates the pool
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max_workers or worker_count(), initializer=_init_worker)
+    return _executor
+
+def _init_worker():
+    # Each worker process builds its own parser and analyzer once
+    global _parser, _analyzer
+    from utils.parsers import ResumeParser
+    from services.analyzer import ProfileAnalyzer
+    _parser = ResumeParser()
+    _analyzer = ProfileAnalyzer()
+
+def process_document(filename, data):
+    # Runs in a worker process; errors are returned rather than raised so one
+    # bad file does not fail the batch
+    try:
+        parsed_data, analysis = analyze_document(_parser, _analyzer, data, filename)
+        return {'filename': filename, 'parsed_data': parsed_data, 'analysis': analysis}
+    except Exception as e:
+        return {'filename': filename, 'error': str(e)}
+
+def process_pages(filename, pages):
+    # Runs in a worker process: parses and scores text extracted elsewhere
+    try:
+        parsed_data, analysis = analyze_pages(_parser, _analyzer, pages)
+        return {'filename': filename, 'parsed_data': parsed_data, 'analysis': analysis}
+    except Exception as e:
+        return {'filename': filename, 'error': str(e)}
+
+def score_records(records):
+    # Runs in a worker process: re-scores already parsed records
+    return _analyzer.analyze_batch(records)
+
+def check_budget(files, size, max_files, max_bytes):
+    if files > max_files:
+        raise BatchTooLarge(f'At most {MAX_BATCH_FILES} files per batch')
+    if size > max_bytes:
+        raise BatchTooLarge(f'At most {MAX_BATCH_BYTES // (1024 * 1024)} MB of documents per batch')
+
+def read_zip(stream, max_files=MAX_BATCH_FILES, max_bytes=MAX_BATCH_BYTES):
+    # Returns (filename, bytes) for each PDF/DOCX member, skipping directories
+    # and other files; oversized members become per-file errors. The member
+    # count and sizes are checked against what is left of the batch's budget
+    # (BatchTooLarge) before any member is read; reads never go past the
+    # sizes the archive declares.
+    with zipfile.ZipFile(stream) as archive:
+        members = []
+        size = 0
+        for member in archive.infolist():
+            filename = secure_filename(os.path.basename(member.filename))
+            if member.is_dir() or not allowed_file(filename):
+                continue
+            members.append((filename, member))
+            if member.file_size <= MAX_FILE_BYTES:
+                size += member.file_size
+            check_budget(len(members), size, max_files, max_bytes)
+        return [
+            (filename, ValueError('File too large') if member.file_size > MAX_FILE_BYTES else archive.read(member))
+            for filename, member in members
+        ]
+
+def extract_documents(extractor, pending):
+    # Extracts (index, filename, data) items in the extractor's workers, using
+    # at most its batch_workers of them across concurrent batches, so single
+    # uploads still find a free worker; returns (index, filename, pages or
+    # error result)
+    def extract(item):
+        index, filename, data = item
+        try:
+            with extractor.batch_slots:
+                return index, filename, extractor.extract(data, filename)
+        except ExtractionError as e:
+            return index, filename, {'filename': filename, 'error': str(e), 'code': e.code}
+    with ThreadPoolExecutor(max_workers=extractor.batch_workers) as threads:
+        return list(threads.map(extract, pending))
+
+def analyze_documents(documents, extractor=None):
+    # documents is a list of (filename, bytes or Exception); results come back
+    # in the same order. With extractor (an ExtractionPool), text is
+    # extracted under its time and memory limits, so one pathological file
+    # costs at most its timeout, and only parsing and scoring go to the
+    # process pool.
+    pending = [(index, filename, data) for index, (filename, data) in enumerate(documents)
+               if not isinstance(data, Exception)]
+    results = [
+        {'filename': filename, 'error': str(data)} if isinstance(data, Exception) else None
+        for filename, data in documents
+    ]
+    if extractor is not None and pending:
+        extracted = extract_documents(extractor, pending)
+        for index, _, result in extracted:
+            if isinstance(result, dict):
+                results[index] = result
+        pending = [item for item in extracted if not isinstance(item[2], dict)]
+        func = process_pages
+    else:
+        func = process_document
+    if pending:
+        chunksize = max(1, len(pending) // (worker_count() * 4))
+        processed = get_executor().map(
+            func,
+            [filename for _, filename, _ in pending],
+            [data for _, _, data in pending],
+            chunksize=chunksize
+        )
+        for (index, _, _), result in zip(pending, processed):
+            results[index] = result
+    return results
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from models.query import encode_cursor, iter_analyses, parse_fields
+
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Columns of a CSV export without a field selection
+CSV_FIELDS = [
+    '_id', 'created_at', 'filename', 'url', 'candidate_id',
+    'parsed_data.type', 'parsed_data.email', 'parsed_data.phone', 'parsed_data.skills',
+    'analysis.overall_score',
+    'analysis.detailed_scores.technical_score',
+    'analysis.detailed_scores.experience_score',
+    'analysis.detailed_scores.education_score',
+    'analysis.detailed_scores.completeness_score'
+]
+# Records encoded per chunk of the response
+CHUNK_SIZE = 200
+
+def parse_date(value):
+    # ISO date or datetime -> the naive UTC ISO string created_at is stored as
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+def selected_fields(fields):
+    # The paths of an explicit field selection, or None for summary/full
+    if not fields or fields in ('summary', 'full'):
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+def iter_export(db, fields=None, since=None, until=None, page_size=500):
+    # Stored analyses newest first with since <= created_at < until, read a
+    # page at a time: listing starts at until and stops at the first record
+    # older than since
+    projection = parse_fields(fields)
+    selected = selected_fields(fields)
+    # parse_fields adds created_at to a selection for the cursor
+    drop_created_at = selected is not None and 'created_at' not in selected
+    cursor = encode_cursor(until, '') if until else None
+    for record in iter_analyses(db, projection, page_size, cursor=cursor):
+        if since and str(record.get('created_at') or '') < since:
+            break
+        if drop_created_at:
+            record.pop('created_at', None)
+        yield record
+
+def value_at(record, path):
+    for part in path.split('.'):
+        if not isinstance(record, dict):
+            return None
+        record = record.get(part)
+    return record
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '; '.join(str(csv_value(item)) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+def encode_ndjson(records):
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, default=str))
+        if len(lines) == CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def encode_csv(records, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, record in enumerate(records, 1):
+        writer.writerow([csv_value(value_at(record, column)) for column in columns])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_analyses(db, format='ndjson', fields=None, since=None, until=None):
+    # Checks the arguments up front (ValueError), then returns a generator of
+    # text chunks, so nothing is read from storage until it is iterated
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format: {format} (expected {' or '.join(FORMATS)})")
+    since, until = parse_date(since), parse_date(until)
+    records = iter_export(db, fields, since, until)
+    if format == 'csv':
+        return encode_csv(records, selected_fields(fields) or CSV_FIELDS)
+    return encode_ndjson(records)
@@ -0,0 +1,203 @@
+import io
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+POLL_SECONDS = 0.02
+# Job statuses after which the worker is killed -> the stats counter
+KILL_EVENTS = {'timeout': 'timeouts', 'memory': 'memory_kills', 'crashed': 'crashes'}
+
+class ExtractionError(Exception):
+    # A document whose text could not be extracted. code is 'invalid' (the
+    # extractor rejected it), 'timeout', 'memory', 'crashed' (the worker
+    # died) or 'busy' (no worker became free in time).
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+def _rss_bytes(pid):
+    # Resident set size from /proc; None where that is not available
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _limit_address_space(max_rss):
+    # Backstop for growth faster than the parent's RSS polling: allocations
+    # past the current address space plus max_rss fail with MemoryError
+    try:
+        import resource
+        with open('/proc/self/statm', 'rb') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        resource.setrlimit(resource.RLIMIT_AS, (current + max_rss, current + max_rss))
+    except (ImportError, OSError, ValueError):
+        pass
+
+def _serve(conn, max_rss):
+    # Worker process: extracts one document per message until the pipe closes
+    from utils.parsers import ResumeParser
+    from services.pipeline import extract_pages
+    parser = ResumeParser()
+    _limit_address_space(max_rss)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        source, filename = job
+        try:
+            conn.send(('ok', list(extract_pages(parser, source, filename))))
+        except MemoryError:
+            conn.send(('memory', f'Extraction of {filename} needs too much memory'))
+        except Exception as e:
+            conn.send(('invalid', f'Could not read {filename}: {e}'))
+
+class _Worker:
+    def __init__(self, max_rss):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, max_rss), daemon=True, name='extraction-worker')
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+class ExtractionPool:
+    # Document text extraction in reusable worker processes, so a document
+    # that makes a parser spin or balloon only costs its own request. Each job
+    # gets timeout seconds of wall-clock time and may grow the worker's
+    # resident memory by max_rss bytes; a worker that exceeds either is killed
+    # and replaced. Workers are also replaced after max_jobs jobs, and started
+    # on first use.
+    def __init__(self, workers=2, timeout=20, max_rss=512 * 1024 * 1024, max_jobs=200, wait_timeout=None):
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.max_jobs = max_jobs
+        # How long a job waits for a free worker
+        self.wait_timeout = timeout if wait_timeout is None else wait_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        # Workers that batch extraction may hold at once, across all batches;
+        # the rest stay free for single uploads
+        self.batch_workers = max(1, workers - 1)
+        self.batch_slots = threading.BoundedSemaphore(self.batch_workers)
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {'jobs': 0, 'invalid': 0, 'timeouts': 0, 'memory_kills': 0, 'crashes': 0, 'busy': 0, 'recycled': 0}
+
+    def _count(self, event):
+        with self._lock:
+            self.stats[event] += 1
+
+    def _checkout(self):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            self._count('busy')
+            raise ExtractionError('All extraction workers are busy', 'busy')
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return _Worker(self.max_rss)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker):
+        # worker is None when it was killed
+        if worker is not None:
+            worker.jobs += 1
+            if worker.jobs >= self.max_jobs:
+                worker.stop()
+                self._count('recycled')
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+        self._slots.release()
+
+    @staticmethod
+    def _payload(source):
+        # Paths are passed as they are; uploads are sent as bytes
+        if isinstance(source, (str, os.PathLike)):
+            return os.fspath(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        source.seek(0)
+        buffer = io.BytesIO()
+        shutil.copyfileobj(source, buffer)
+        source.seek(0)
+        return buffer.getvalue()
+
+    def extract(self, source, filename):
+        # Returns the document's page texts, or raises ExtractionError
+        payload = self._payload(source)
+        worker = self._checkout()
+        self._count('jobs')
+        try:
+            status, result = self._run(worker, payload, filename)
+        except BaseException:
+            # Interrupted mid-job: the worker may still be busy with it
+            self._discard(worker)
+            raise
+        if status in KILL_EVENTS:
+            # A worker that hit MemoryError itself is replaced too, as its
+            # heap is left fragmented
+            self._discard(worker, KILL_EVENTS[status])
+            raise ExtractionError(result, status)
+        self._checkin(worker)
+        if status != 'ok':
+            self._count('invalid')
+            raise ExtractionError(result, 'invalid')
+        return result
+
+    def _run(self, worker, payload, filename):
+        # Sends a job and waits for its (status, result), checking the worker's
+        # liveness, the deadline and its RSS while it runs
+        try:
+            # Forked workers share the server's pages, so the limit is on growth
+            limit = (_rss_bytes(worker.process.pid) or 0) + self.max_rss
+            worker.conn.send((payload, filename))
+            deadline = time.monotonic() + self.timeout
+            while not worker.conn.poll(POLL_SECONDS):
+                if not worker.process.is_alive():
+                    return 'crashed', f'Extraction of {filename} crashed'
+                if time.monotonic() > deadline:
+                    return 'timeout', f'Extraction of {filename} took longer than {self.timeout:g}s'
+                rss = _rss_bytes(worker.process.pid)
+                if rss is not None and rss > limit:
+                    return 'memory', f'Extraction of {filename} used more than {self.max_rss // (1024 * 1024)} MB'
+            return worker.conn.recv()
+        except (EOFError, OSError):
+            return 'crashed', f'Extraction of {filename} crashed'
+
+    def _discard(self, worker, event=None):
+        worker.kill()
+        if event:
+            self._count(event)
+        self._checkin(None)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, idle_workers=len(self._idle))
+
+    def close(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,186 @@
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+
+class QueueFull(Exception):
+    pass
+
+class JobQueue:
+    # Uploads waiting to be processed. Each job is a payload file plus a small
+    # JSON record in job_dir, written before the job is queued, so jobs that
+    # were queued or running when the process stopped are picked up again on
+    # the next start.
+    #
+    # Worker processes can share job_dir. Each one queues every unfinished job
+    # it finds on start, and a job only runs in the process that claims it:
+    # the claim is a lock on the job's claim file, held while it runs and
+    # released by the OS if that process dies. A claimed job that is already
+    # finished is skipped.
+    def __init__(self, handler, job_dir='jobs', workers=2, max_pending=100, ttl_seconds=24 * 3600):
+        self.handler = handler
+        self.job_dir = job_dir
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        os.makedirs(self.job_dir, exist_ok=True)
+
+    def start(self):
+        # Jobs are processed at least once: one interrupted while running is
+        # run again from the start
+        recovered = self._recover()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        # Recovered jobs may exceed the queue bound, so feed them from a
+        # separate thread that blocks until the workers make room
+        threading.Thread(target=self._requeue, args=(recovered,), daemon=True).start()
+
+    def _record_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.json')
+
+    def _claim_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.claim')
+
+    def _payload_path(self, job):
+        return os.path.join(self.job_dir, f"{job['_id']}-{job['filename']}")
+
+    def _write(self, job):
+        job['updated_at'] = datetime.utcnow().isoformat()
+        path = self._record_path(job['_id'])
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp_path, path)
+
+    def submit(self, filename, data):
+        # data is the upload as bytes or a binary stream. A full queue is
+        # checked before anything is written; if it fills up while the payload
+        # is written, the job's files are removed again.
+        if self._queue.full():
+            raise QueueFull('Too many uploads are waiting to be processed')
+        job_id = uuid.uuid4().hex
+        job = {'_id': job_id, 'status': 'queued', 'filename': filename, 'created_at': datetime.utcnow().isoformat()}
+        try:
+            with open(self._payload_path(job), 'wb') as f:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f)
+            self._write(job)
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            self._discard(job)
+            raise QueueFull('Too many uploads are waiting to be processed')
+        except BaseException:
+            self._discard(job)
+            raise
+        return job
+
+    def get(self, job_id):
+        if not JOB_ID_RE.fullmatch(job_id):
+            return None
+        try:
+            with open(self._record_path(job_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _discard(self, job):
+        # Another process may be discarding the same job
+        for path in (self._payload_path(job), self._record_path(job['_id']), self._claim_path(job['_id'])):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def _claim(self, job_id):
+        # Yields whether this thread holds the job's claim, a non-blocking
+        # exclusive lock on its claim file; it is released on exit
+        with open(self._claim_path(job_id), 'a+b') as f:
+            try:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                yield False
+                return
+            yield True
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                with self._claim(job_id) as claimed:
+                    # Read under the claim: another process may have run it
+                    job = self.get(job_id) if claimed else None
+                    if job and job['status'] in ('queued', 'running'):
+                        self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        job['status'] = 'running'
+        self._write(job)
+        payload = self._payload_path(job)
+        try:
+            job['result'] = self.handler(payload, job['filename'])
+            job['status'] = 'done'
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        self._write(job)
+        if os.path.exists(payload):
+            os.remove(payload)
+
+    def _recover(self):
+        # Returns the ids of unfinished jobs, oldest first, and drops finished
+        # ones older than the TTL
+        jobs = []
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.job_dir):
+            path = os.path.join(self.job_dir, name)
+            if name.endswith('.tmp'):
+                # Left by a crash mid-write, unless another process is
+                # writing it right now
+                try:
+                    if os.path.getmtime(path) < time.time() - 60:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if not name.endswith('.json'):
+                continue
+            job = self.get(name[:-len('.json')])
+            if job is None:
+                continue
+            if job['status'] in ('queued', 'running'):
+                jobs.append(job)
+            elif os.path.getmtime(path) < cutoff:
+                self._discard(job)
+        return [job['_id'] for job in sorted(jobs, key=lambda job: job['created_at'])]
+
+    def _requeue(self, job_ids):
+        for job_id in job_ids:
+            self._queue.put(job_id)
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Quantiles are taken over the most recent observations of each series
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW_SIZE = 1024
+
+def page_bucket(pages):
+    # Keeps the pages label to a handful of values
+    if not pages:
+        return ''
+    if pages == 1:
+        return '1'
+    if pages <= 3:
+        return '2-3'
+    if pages <= 10:
+        return '4-10'
+    return '11+'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+class Summary:
+    # Prometheus summary: per label set, a count, a sum and quantiles over a
+    # sliding window of recent observations. Observing is an append under a
+    # lock; sorting only happens when the metrics are rendered.
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0, 0.0, deque(maxlen=WINDOW_SIZE)]
+            series[0] += 1
+            series[1] += value
+            series[2].append(value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} summary']
+        with self._lock:
+            series = [(key, count, total, sorted(window)) for key, (count, total, window) in sorted(self._series.items())]
+        for key, count, total, window in series:
+            labels = list(zip(self.label_names, key))
+            for quantile in QUANTILES:
+                value = window[min(int(len(window) * quantile), len(window) - 1)]
+                lines.append(f'{self.name}{_format_labels(labels + [("quantile", quantile)])} {value:.6f}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {total:.6f}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+class Gauge:
+    # Values set or adjusted in place, or read from a callback at render time
+    def __init__(self, name, help_text, label_names=(), callback=None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self, kind='gauge'):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {kind}']
+        if self.callback:
+            values = sorted(self.callback().items())
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        for key, value in values:
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f'{self.name}{_format_labels(list(zip(self.label_names, key)))} {value}')
+        return lines
+
+class StageTimer:
+    # Durations of the stages of one request, in the order they ran, and the
+    # number of document pages it read
+    def __init__(self):
+        self.durations = {}
+        self.pages = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def timed_pages(self, pages):
+        # Yields pages, adding the time spent producing each to 'extract'.
+        # Pages are extracted lazily while being parsed, so this is how the
+        # two stages are told apart.
+        iterator = iter(pages)
+        while True:
+            start = time.perf_counter()
+            try:
+                page = next(iterator)
+            except StopIteration:
+                self.add('extract', time.perf_counter() - start)
+                return
+            self.add('extract', time.perf_counter() - start)
+            self.pages += 1
+            yield page
+
+    def server_timing(self):
+        # Server-Timing header value, durations in milliseconds
+        return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.durations.items())
+
+class MetricsRegistry:
+    def __init__(self):
+        self.stage_seconds = Summary(
+            'resume_stage_seconds', 'Time spent in each stage of an analysis request',
+            ('endpoint', 'stage', 'file_type', 'pages')
+        )
+        self.request_seconds = Summary('resume_request_seconds', 'Time to handle a request', ('endpoint', 'status'))
+        self.in_flight = Gauge('resume_requests_in_flight', 'Requests currently being handled', ('endpoint',))
+        self._collectors = []
+
+    def observe_stages(self, timer, endpoint, file_type=''):
+        bucket = page_bucket(timer.pages)
+        for stage, seconds in timer.durations.items():
+            self.stage_seconds.observe(seconds, endpoint=endpoint, stage=stage, file_type=file_type, pages=bucket)
+
+    def add_gauge(self, name, help_text, callback, label_names=(), kind='gauge'):
+        # callback returns {label value or tuple of values: number}
+        self._collectors.append((Gauge(name, help_text, label_names, callback), kind))
+
+    def render(self):
+        lines = self.stage_seconds.render() + self.request_seconds.render() + self.in_flight.render()
+        for gauge, kind in self._collectors:
+            lines.extend(gauge.render(kind))
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
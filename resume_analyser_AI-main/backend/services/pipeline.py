@@ -0,0 +1,56 @@
+import time
+from services.metrics import StageTimer
+
+ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+MAX_PDF_PAGES = 50
+MAX_TEXT_BYTES = 1024 * 1024
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def scoring_version(analyzer):
+    # Identifies the scoring rules and weights applied to parsed data
+    weights = ','.join(f'{name}={weight}' for name, weight in sorted(analyzer.skill_weights.items()))
+    return f'analyzer{analyzer.VERSION}-{weights}'
+
+def pipeline_version(parser, analyzer):
+    # Identifies everything that affects a document's parsed data and scores
+    return f'parser{parser.VERSION}-skills{parser.skill_matcher.version}-{scoring_version(analyzer)}'
+
+def extract_pages(parser, source, filename):
+    # source is a path, bytes or a binary stream; filename picks the format
+    if filename.lower().endswith('.pdf'):
+        return parser.iter_pdf_pages(source, max_pages=MAX_PDF_PAGES, max_bytes=MAX_TEXT_BYTES)
+    return parser.iter_docx_text(source, max_bytes=MAX_TEXT_BYTES)
+
+def analyze_document(parser, analyzer, source, filename, timer=None, extractor=None):
+    # source is a path, bytes or a binary stream; filename picks the format.
+    # Stage durations (extract, parse, score) are added to timer when given.
+    # With extractor (an ExtractionPool), the text is extracted in one of its
+    # worker processes rather than streamed in this one.
+    timer = timer or StageTimer()
+    if extractor is not None:
+        with timer.stage('extract'):
+            pages = extractor.extract(source, filename)
+    else:
+        pages = extract_pages(parser, source, filename)
+    return analyze_pages(parser, analyzer, pages, timer)
+
+def analyze_pages(parser, analyzer, pages, timer=None):
+    # pages is an iterable of page texts; when they are extracted lazily,
+    # the time spent producing them goes to the extract stage
+    timer = timer or StageTimer()
+
+    # Parse candidate details page by page; extraction time is taken out of
+    # the parse stage
+    extract_before = timer.durations.get('extract', 0.0)
+    start = time.perf_counter()
+    parsed_data = parser.parse_pages(timer.timed_pages(pages))
+    extracted = timer.durations.get('extract', 0.0) - extract_before
+    timer.add('parse', time.perf_counter() - start - extracted)
+    parsed_data['type'] = 'resume'
+
+    # Analyze and score
+    with timer.stage('score'):
+        analysis = analyzer.analyze_resume(parsed_data)
+    return parsed_data, analysis
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+from collections import deque
+from services import batch
+from services.pipeline import scoring_version
+
+# Records scored by ProfileAnalyzer; LinkedIn URL analyses are scored by a
+# different analyzer and are left alone
+RESCORE_TYPES = ('resume', 'linkedin')
+RESCORE_PROJECTION = {'parsed_data': 1, 'created_at': 1}
+
+def load_checkpoint(path, version):
+    # A checkpoint from a finished run or from other scoring rules starts over
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('done') or state.get('version') != version:
+        return None
+    return state
+
+def save_checkpoint(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def rescore_archive(db, analyzer, chunk_size=500, checkpoint_path=None, workers=None, progress=None):
+    # Walks stored analyses newest first, one page of chunk_size at a time,
+    # scores each page's parsed_data in the process pool and writes the new
+    # analyses back with one bulk update per page. Pages are written in
+    # order and the checkpoint records the cursor after the last written
+    # page, so an interrupted run resumes from there. Records added while
+    # the run is going are newer than the first page and already use the
+    # current rules.
+    version = scoring_version(analyzer)
+    state = load_checkpoint(checkpoint_path, version) if checkpoint_path else None
+    if state is None:
+        state = {'version': version, 'cursor': None, 'scanned': 0, 'updated': 0, 'done': False}
+    executor = batch.get_executor(workers)
+    max_in_flight = (workers or batch.worker_count()) * 2
+    total = db.count_analyses()
+    started = time.time()
+    run_scanned = 0
+
+    in_flight = deque()
+    cursor = state['cursor']
+    exhausted = False
+    while in_flight or not exhausted:
+        while not exhausted and len(in_flight) < max_in_flight:
+            page = db.get_analyses_page(limit=chunk_size, cursor=cursor, projection=RESCORE_PROJECTION)
+            cursor = page['next_cursor']
+            exhausted = cursor is None
+            records = [
+                record for record in page['analyses']
+                if (record.get('parsed_data') or {}).get('type') in RESCORE_TYPES
+            ]
+            future = executor.submit(batch.score_records, [record['parsed_data'] for record in records])
+            in_flight.append((len(page['analyses']), [record['_id'] for record in records], future, cursor))
+
+        scanned, ids, future, next_cursor = in_flight.popleft()
+        analyses = future.result()
+        if ids:
+            db.update_analyses([(analysis_id, {'analysis': analysis}) for analysis_id, analysis in zip(ids, analyses)])
+        run_scanned += scanned
+        state.update(
+            cursor=next_cursor,
+            scanned=state['scanned'] + scanned,
+            updated=state['updated'] + len(ids),
+            done=next_cursor is None
+        )
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, state)
+        if progress:
+            elapsed = time.time() - started
+            progress(dict(state, total=total, elapsed=elapsed, rate=run_scanned / elapsed if elapsed else 0.0))
+    return state
@@ -0,0 +1,125 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+class ResultCache:
+    # Parsed data and analysis keyed by a hash of the uploaded bytes and the
+    # pipeline version, so a re-upload of the same file skips extraction and
+    # scoring. An LRU of max_entries lives in memory; with disk_dir set,
+    # entries are also written there (up to max_disk_entries, oldest dropped
+    # first) and survive restarts.
+    def __init__(self, max_entries=512, disk_dir=None, max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        self._disk_count = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_count = len(self._disk_files())
+
+    @staticmethod
+    def key(data, version):
+        digest = hashlib.sha256(version.encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    @classmethod
+    def key_for_file(cls, source, version, chunk_size=1024 * 1024):
+        # source is a path or a seekable binary stream, which is rewound
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return cls.key_for_file(f, version, chunk_size)
+        digest = hashlib.sha256(version.encode('utf-8'))
+        source.seek(0)
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+        source.seek(0)
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.json')
+
+    def _disk_files(self):
+        return [name for name in os.listdir(self.disk_dir) if name.endswith('.json')]
+
+    def get(self, key):
+        # Returns (parsed_data, analysis) copies, or None on a miss
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return copy.deepcopy(entry)
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), 'r') as f:
+                    entry = tuple(json.load(f))
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                try:
+                    os.utime(self._disk_path(key))
+                except OSError:
+                    pass
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                    self._remember(key, entry)
+                return copy.deepcopy(entry)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, parsed_data, analysis):
+        entry = copy.deepcopy((parsed_data, analysis))
+        with self._lock:
+            self._remember(key, entry)
+        if self.disk_dir:
+            self._write_disk(key, entry)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _write_disk(self, key, entry):
+        path = self._disk_path(key)
+        existed = os.path.exists(path)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if not existed:
+                self._disk_count += 1
+            over = self._disk_count - self.max_disk_entries
+        if over > 0:
+            # Trim a tenth extra so the directory is not listed on every put
+            self._prune_disk(over + self.max_disk_entries // 10)
+
+    def _prune_disk(self, count):
+        paths = [os.path.join(self.disk_dir, name) for name in self._disk_files()]
+        paths.sort(key=os.path.getmtime)
+        removed = 0
+        for path in paths[:count]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_count -= removed
+            self.stats['disk_evictions'] += removed
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), disk_entries=self._disk_count)
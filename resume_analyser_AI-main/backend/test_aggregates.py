@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from models.aggregates import Aggregates
+
+def record(analysis_id, day, score=50):
+    return {
+        '_id': analysis_id,
+        'created_at': day + 'T12:00:00',
+        'parsed_data': {'type': 'resume', 'skills': ['Python']},
+        'analysis': {'overall_score': score}
+    }
+
+def days_ago(days):
+    return (datetime.utcnow().date() - timedelta(days=days)).isoformat()
+
+def test_uploads_per_day_is_calendar_window(tmp_path):
+    aggregates = Aggregates(str(tmp_path / 'aggregates.jsonl'))
+    aggregates.add([record('a', days_ago(0)), record('b', days_ago(2)), record('c', days_ago(40))])
+    assert aggregates.summary(days=3)['uploads_per_day'] == {days_ago(2): 1, days_ago(0): 1}
+    # The last upload is older than the window, not the last 1 day with uploads
+    assert aggregates.summary(days=1)['uploads_per_day'] == {days_ago(0): 1}
+    assert aggregates.summary(days=0)['uploads_per_day'] == {}
+
+def test_day_dropped_when_emptied(tmp_path):
+    aggregates = Aggregates(str(tmp_path / 'aggregates.jsonl'))
+    aggregates.add([record('a', days_ago(1))])
+    # An update with a new created_at moves the record to another day
+    aggregates.add([{'_id': 'a', 'created_at': days_ago(0) + 'T08:00:00'}])
+    assert aggregates.day_order == [days_ago(0)]
+    assert aggregates.summary(days=5)['uploads_per_day'] == {days_ago(0): 1}
+
+def test_log_compacted_on_load(tmp_path):
+    path = str(tmp_path / 'aggregates.jsonl')
+    aggregates = Aggregates(path)
+    for score in range(1500):
+        aggregates.add([record('a', days_ago(0), score % 100)])
+    aggregates.log.close()
+    with open(path) as f:
+        assert sum(1 for _ in f) == 1500
+    reloaded = Aggregates(path)
+    with open(path) as f:
+        assert sum(1 for _ in f) == 1
+    assert reloaded.summary() == aggregates.summary()
+    assert reloaded.summary()['scores']['overall_score']['mean'] == 99
+
+if __name__ == '__main__':
+    import tempfile
+    from pathlib import Path
+    for test in (test_uploads_per_day_is_calendar_window, test_day_dropped_when_emptied, test_log_compacted_on_load):
+        with tempfile.TemporaryDirectory() as directory:
+            test(Path(directory))
+    print('ok')
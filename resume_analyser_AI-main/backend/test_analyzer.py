@@ -0,0 +1,52 @@
+import json
+import random
+
+from benchmarks.synthetic import resume_text
+from services.analyzer import ProfileAnalyzer
+from utils.parsers import ResumeParser
+
+analyzer = ProfileAnalyzer()
+
+def varied_records():
+    records = [
+        {},
+        {'text': ''},
+        {'skills': []},
+        {'skills': None, 'education': None},
+        {'email': 'jane@example.com', 'phone': '555-123-4567', 'skills': ['Python'] * 12,
+         'education': ['CGPA: 9.2', 'B.Tech, State University 2018'], 'text': '12 years of experience'},
+        {'education': ['CGPA: 6.5']},
+        {'education': ['CGPA: 8.1', 'Percentage: 91.5%', 'PhD, State University 2020']},
+        {'education': ['Percentage: 72.5%', 'Master of Science 2016'], 'text': '3 years in support, 2 yrs leading'},
+        {'education': ['55%', 'Diploma in design, City College']},
+        {'education': ['MBA, Business School 2019', 'Bachelor of Arts 2015']},
+        {'education': ['Education details not clearly specified'], 'skills': ['Go', 'SQL']},
+        {'email': 'a@b.co', 'skills': ['Docker'], 'text': 'Worked 4.5 years on backend systems'},
+    ]
+    parser = ResumeParser()
+    for seed in range(20):
+        records.append(parser.parse_pages([resume_text(pages=1 + seed % 3, seed=seed)]))
+    rng = random.Random(7)
+    fields = ['email', 'phone', 'skills', 'education', 'text']
+    for record in list(records[-20:]):
+        # The same resumes with fields missing or emptied
+        partial = {field: value for field, value in record.items() if field not in rng.sample(fields, 2)}
+        partial['skills'] = partial.get('skills', [])[:rng.randint(0, 3)]
+        records.append(partial)
+    return records
+
+def test_batch_equals_per_record():
+    records = varied_records()
+    batch = analyzer.analyze_batch(records)
+    assert len(batch) == len(records)
+    for record, result in zip(records, batch):
+        # Serialized, so 80 and 80.0 count as different
+        assert json.dumps(result, sort_keys=True) == json.dumps(analyzer.analyze_resume(record), sort_keys=True), record
+
+def test_empty_batch():
+    assert analyzer.analyze_batch([]) == []
+
+if __name__ == '__main__':
+    test_batch_equals_per_record()
+    test_empty_batch()
+    print('ok')
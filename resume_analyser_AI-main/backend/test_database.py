@@ -0,0 +1,111 @@
+import base64
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from models.database import Database
+from models.query import SUMMARY_PROJECTION, encode_cursor, iter_analyses
+
+def record(i, text='Python developer'):
+    return {
+        'filename': f'resume{i}.pdf',
+        'parsed_data': {'text': f'{text} {i}', 'skills': ['Python']},
+        'analysis': {'overall_score': i, 'detailed_scores': {'technical_score': i}}
+    }
+
+@pytest.fixture
+def db(monkeypatch):
+    # pymongo 4.11+ passes sort to bulk updates, which mongomock 4.3 predates
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        mongomock.collection.BulkOperationBuilder, 'add_update',
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+    )
+    return Database(client=mongomock.MongoClient())
+
+def test_save_analysis(db):
+    seen = []
+    db.listeners.append(seen.extend)
+    result = db.save_analysis(record(1))
+    assert isinstance(result.inserted_id, str)
+    stored = db.get_analysis(result.inserted_id)
+    assert stored['_id'] == result.inserted_id
+    assert stored['parsed_data']['text'] == 'Python developer 1'
+    # created_at comes back as an ISO string, as from SimpleStorage
+    assert datetime.fromisoformat(stored['created_at'])
+    assert [saved['_id'] for saved in seen] == [result.inserted_id]
+    assert isinstance(seen[0]['created_at'], str)
+
+def test_save_analyses_inserts_many(db):
+    seen = []
+    db.listeners.append(seen.extend)
+    records = [record(i) for i in range(5)]
+    result = db.save_analyses(records)
+    assert len(result.inserted_ids) == 5 and len(set(result.inserted_ids)) == 5
+    assert db.count_analyses() == 5
+    assert [saved['_id'] for saved in seen] == [str(analysis_id) for analysis_id in result.inserted_ids]
+    assert db.save_analyses([]).inserted_ids == []
+
+def test_get_analysis_missing_and_legacy_ids(db):
+    assert db.get_analysis('no-such-id') is None
+    # Documents saved by earlier versions have ObjectId ids
+    legacy_id = db.analyses.insert_one({'parsed_data': {'text': 'old'}, 'created_at': datetime(2020, 1, 1)}).inserted_id
+    stored = db.get_analysis(str(legacy_id))
+    assert stored['_id'] == str(legacy_id)
+    assert stored['created_at'] == '2020-01-01T00:00:00'
+
+def test_pages_newest_first_without_gaps(db):
+    ids = []
+    for i in range(7):
+        ids.append(db.save_analysis(record(i)).inserted_id)
+    # Several records share a timestamp: save_analyses stamps them together
+    ids.extend(db.save_analyses([record(i) for i in range(7, 12)]).inserted_ids)
+
+    pages = []
+    cursor = None
+    while True:
+        page = db.get_analyses_page(limit=3, cursor=cursor)
+        pages.append(page['analyses'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    listed = [analysis['_id'] for page in pages for analysis in page]
+    assert all(len(page) == 3 for page in pages[:-1])
+    assert sorted(listed) == sorted(ids)
+    assert len(set(listed)) == len(listed)
+    keys = [(analysis['created_at'], analysis['_id']) for page in pages for analysis in page]
+    assert keys == sorted(keys, reverse=True)
+    assert [analysis['_id'] for analysis in iter_analyses(db, page_size=4)] == listed
+
+def test_invalid_cursors(db):
+    db.save_analysis(record(1))
+    wrong_types = base64.urlsafe_b64encode(b'[1, 2]').decode('ascii')
+    for cursor in ('not a cursor', wrong_types, encode_cursor('yesterday', 'some-id')):
+        with pytest.raises(ValueError):
+            db.get_analyses_page(cursor=cursor)
+
+def test_projection_leaves_out_text(db):
+    db.save_analysis(record(1))
+    summary = db.get_analyses_page(projection=SUMMARY_PROJECTION)['analyses'][0]
+    assert 'text' not in summary['parsed_data']
+    assert summary['parsed_data']['skills'] == ['Python']
+    only_scores = db.get_analyses_page(projection={'analysis.overall_score': 1, 'created_at': 1})['analyses'][0]
+    assert only_scores['analysis'] == {'overall_score': 1}
+    assert 'parsed_data' not in only_scores and 'filename' not in only_scores
+
+def test_update_analyses(db):
+    seen = []
+    first = db.save_analysis(record(1)).inserted_id
+    second = db.save_analysis(record(2)).inserted_id
+    db.listeners.append(seen.extend)
+    new_analysis = {'overall_score': 99, 'detailed_scores': {'technical_score': 98}}
+    result = db.update_analyses([(first, {'analysis': new_analysis}), (second, {'candidate_id': 'c1'})])
+    assert result.modified_count == 2
+    updated = db.get_analysis(first)
+    assert updated['analysis'] == new_analysis
+    # Only the given top-level fields change
+    assert updated['parsed_data']['text'] == 'Python developer 1'
+    assert db.get_analysis(second)['candidate_id'] == 'c1'
+    assert seen == [{'analysis': new_analysis, '_id': first}, {'candidate_id': 'c1', '_id': second}]
+    assert db.update_analyses([]).modified_count == 0
@@ -0,0 +1,65 @@
+import random
+
+from benchmarks.synthetic import resume_lines
+from utils import extraction
+from utils.parsers import ResumeParser
+
+parser = ResumeParser()
+
+def joined_extraction(pages):
+    # What a single scan of the whole text finds, bypassing the cache that
+    # parse_pages fills
+    text = ''.join(pages)
+    result = extraction.combine([extraction.scan(text)])
+    return {'email': result.email, 'phone': result.phone, 'education': parser._education_list(result)}
+
+def page_extraction(pages):
+    parsed = parser.parse_pages(pages)
+    return {'email': parsed['email'], 'phone': parsed['phone'], 'education': parsed['education']}
+
+def test_grades_on_a_later_page():
+    # Five degree lines on page 1 must not crowd out the grades on page 2
+    page_one = ''.join(f'Bachelor of Science, State University {year}\n' for year in range(2010, 2015))
+    pages = [page_one, 'CGPA: 8.7\nPercentage: 82.5%\n']
+    result = page_extraction(pages)
+    assert result == joined_extraction(pages)
+    assert 'CGPA: 8.7' in result['education'] and 'Percentage: 82.5%' in result['education']
+
+def test_labelled_phone_on_a_later_page():
+    pages = ['Jane Roe\nOffice 555-123-4567 ext 12\n', 'Phone: +1 555 987 6543\n']
+    result = page_extraction(pages)
+    assert result == joined_extraction(pages)
+    assert result['phone'] == '+1 555 987 6543'
+
+def test_pages_split_anywhere():
+    # Page breaks inside lines, labels and numbers give the joined-text result
+    extras = ['CGPA: 8.5', 'Percentage: 78.5%', 'Mobile:\n555-987-6543', '9.1 CGPA', 'GPA 3.8 / 4.0',
+              '3\nyears in support', 'M.Tech, State University 2019', 'jane@example.com']
+    for seed in range(200):
+        rng = random.Random(seed)
+        lines = resume_lines(3, seed) + rng.sample(extras, 4)
+        rng.shuffle(lines)
+        text = '\n'.join(lines)
+        cuts = sorted(rng.sample(range(len(text)), 4))
+        pages = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+        assert page_extraction(pages) == joined_extraction(pages), seed
+
+def test_email_and_phone_settle_early():
+    # Once page 1 settles them, later pages are not searched for email or
+    # phone, and a different one there does not change the result
+    scanner = extraction.IncrementalScan()
+    pages = ['jane@example.com\nPhone: +1 555 123 4567\nSummary\n', 'Notes\njohn@example.com\nMobile: 555-987-6543\nCGPA: 8.2\n']
+    for page in pages:
+        scanner.feed(page)
+    result = scanner.result(''.join(pages))
+    assert (result.email, result.phone) == ('jane@example.com', '+1 555 123 4567')
+    assert parser._education_list(result) == joined_extraction(pages)['education']
+    assert len(scanner.scans) > 1
+    assert all(later.email is None and later.phones == {} for later in scanner.scans[1:])
+
+if __name__ == '__main__':
+    test_grades_on_a_later_page()
+    test_labelled_phone_on_a_later_page()
+    test_pages_split_anywhere()
+    test_email_and_phone_settle_early()
+    print('ok')
@@ -0,0 +1,129 @@
+import re
+import zipfile
+from xml.parsers import expat
+
+# Streams the text out of a DOCX without building a document tree: the XML
+# parts are read from the zip in blocks and fed to expat, and lines are handed
+# out as their paragraphs close. Headers come first (contact details often sit
+# there), then the body, then the footers.
+_W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main '
+_MC = 'http://schemas.openxmlformats.org/markup-compatibility/2006 '
+PARAGRAPH = _W + 'p'
+RUN = _W + 'r'
+TEXT = _W + 't'
+TAB = _W + 'tab'
+BREAKS = {_W + 'br', _W + 'cr'}
+ROW = _W + 'tr'
+CELL = _W + 'tc'
+FALLBACK = _MC + 'Fallback'
+DOCUMENT_PART = 'word/document.xml'
+PART_RE = re.compile(r'word/(header|footer)(\d*)\.xml$')
+READ_SIZE = 64 * 1024
+
+class _TextHandler:
+    # expat callbacks producing one line per paragraph and per table row,
+    # with a row's cells separated by tabs. Text boxes are paragraphs nested
+    # in a paragraph and come out as lines of their own; their legacy copy
+    # under mc:Fallback is skipped. Tab stops in paragraph properties are
+    # also w:tab, so tabs and breaks only count inside runs.
+    def __init__(self):
+        self.lines = []
+        self._paragraphs = []
+        self._rows = []
+        self._cells = []
+        self._runs = 0
+        self._in_text = False
+        self._fallback = 0
+
+    def start(self, name, attrs):
+        if name == FALLBACK or self._fallback:
+            self._fallback += name == FALLBACK
+            return
+        if name == PARAGRAPH:
+            self._paragraphs.append([])
+        elif name == RUN:
+            self._runs += 1
+        elif name == TEXT:
+            self._in_text = True
+        elif self._runs and self._paragraphs and name == TAB:
+            self._paragraphs[-1].append('\t')
+        elif self._runs and self._paragraphs and name in BREAKS:
+            self._paragraphs[-1].append('\n')
+        elif name == ROW:
+            self._rows.append([])
+        elif name == CELL:
+            self._cells.append([])
+
+    def end(self, name):
+        if self._fallback:
+            self._fallback -= name == FALLBACK
+            return
+        if name == TEXT:
+            self._in_text = False
+        elif name == RUN:
+            self._runs -= 1
+        elif name == PARAGRAPH:
+            self._line(''.join(self._paragraphs.pop()))
+        elif name == CELL:
+            cell = ' '.join(line for line in self._cells.pop() if line)
+            if self._rows:
+                self._rows[-1].append(cell)
+        elif name == ROW:
+            self._line('\t'.join(self._rows.pop()))
+
+    def text(self, data):
+        if self._in_text and self._paragraphs and not self._fallback:
+            self._paragraphs[-1].append(data)
+
+    def _line(self, line):
+        # Lines inside a table cell make up the cell's text
+        if self._cells:
+            self._cells[-1].append(line)
+        else:
+            self.lines.append(line)
+
+def _parts(archive):
+    names = set(archive.namelist())
+    if DOCUMENT_PART not in names:
+        raise ValueError('Invalid DOCX file: no word/document.xml')
+    found = {'header': [], 'footer': []}
+    for name in names:
+        match = PART_RE.match(name)
+        if match:
+            found[match.group(1)].append((int(match.group(2) or 0), name))
+    return [name for _, name in sorted(found['header'])] + [DOCUMENT_PART] + [name for _, name in sorted(found['footer'])]
+
+def iter_part_lines(part):
+    # Lines of one XML part, handed out after each block read from the zip
+    handler = _TextHandler()
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.text
+    while True:
+        block = part.read(READ_SIZE)
+        parser.Parse(block, not block)
+        if handler.lines:
+            yield handler.lines
+            handler.lines = []
+        if not block:
+            break
+
+def iter_docx_lines(file):
+    # Batches of lines from a DOCX opened as a binary file. Lines repeated
+    # across headers and footers (the first-page, even and default variants
+    # usually share them) are given once.
+    try:
+        with zipfile.ZipFile(file) as archive:
+            seen = set()
+            for name in _parts(archive):
+                with archive.open(name) as part:
+                    for lines in iter_part_lines(part):
+                        if name != DOCUMENT_PART:
+                            lines = [line for line in lines if line.strip() and line not in seen]
+                            seen.update(lines)
+                        if lines:
+                            yield lines
+    except (zipfile.BadZipFile, expat.ExpatError) as e:
+        raise ValueError(f'Invalid DOCX file: {e}')
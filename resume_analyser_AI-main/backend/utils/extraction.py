@@ -0,0 +1,278 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+# Everything the parser and analyzer pull out of resume text, compiled once.
+# Phone numbers, grades, percentages and experience years all start with a
+# digit (or +), so they share one alternation behind a (?=[\d+]) gate that lets
+# the regex engine skip ordinary prose without trying each branch. Labels such
+# as "CGPA:" are checked by looking back from the number, and suffixes such as
+# "%" or "years" are captured by a lookahead so they stay free for the next
+# match, as they were when each pattern ran on its own.
+_NUMBER = r'[+]?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}'
+
+NUMERIC_RE = re.compile(
+    r'(?=[\d+])(?:'
+    rf'(?P<phone>{_NUMBER})'
+    r'|(?P<long_phone>[+]?\d{10,15})'
+    r'|(?P<short_phone>\d{3}[\s.-]\d{3}[\s.-]\d{4})'
+    r'|(?P<decimal>(?P<whole>[0-9]{1,2})\.(?P<fraction>[0-9]{1,2}))'
+    r'(?=(?P<decimal_suffix>%|[\s]*(?:cgpa|percent|years?|yrs?)|[\s]*/[\s]*[0-9]\.[0-9]{1,2})?)'
+    r'|(?P<whole_percent>[0-9]{1,2})%'
+    r'|(?P<years>\d+)(?=\s*(?:years?|yrs?))'
+    r')',
+    re.IGNORECASE
+)
+LABEL_RE = re.compile(r'(?:(?P<cgpa>c?gpa)|(?P<percentage>percentage)|(?P<phone>phone|mobile|tel|contact))[:\s]*$', re.IGNORECASE)
+LABEL_WINDOW = 40
+DEGREE_RE = re.compile(r'bachelor|master|phd|degree|diploma|b\.tech|m\.tech|mba')
+DEGREE_RE_IGNORECASE = re.compile(DEGREE_RE.pattern, re.IGNORECASE)
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+EMAIL_LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+YEAR_RE = re.compile(r'(19|20)\d{2}')
+NON_PHONE_RE = re.compile(r'[^\d+]')
+SKIP_LINE_RE = re.compile(r'email|phone|address|skill|experience|work', re.IGNORECASE)
+INSTITUTION_RE = re.compile(r'university|college|institute', re.IGNORECASE)
+
+# Characters that can continue a match past a line break: the next digits of
+# a phone number, or the whitespace, "/", "cgpa", "percent" or "years" after a
+# number
+CONTINUATION_CHARS = frozenset(' \t\n\r\f\v0123456789(/cCpPyY')
+
+Extraction = namedtuple('Extraction', ['email', 'phone', 'education', 'experience_years'])
+# What one scan found, by kind and in text order, before precedence and
+# filtering; scans of consecutive pieces of a text combine into the result for
+# the whole text
+Scan = namedtuple('Scan', ['email', 'phones', 'cgpa', 'percentages', 'degree_lines', 'experience_years'])
+
+def _find_email(text):
+    # Every email contains an @, so start matching at the first one
+    at = text.find('@')
+    if at == -1:
+        return None
+    start = at
+    while start > 0 and text[start - 1] in EMAIL_LOCAL_CHARS:
+        start -= 1
+    match = EMAIL_RE.search(text, start)
+    return match.group() if match else None
+
+def _label_before(text, position):
+    return LABEL_RE.search(text, max(position - LABEL_WINDOW, 0), position)
+
+PHONE_KINDS = ('labelled_phone', 'phone', 'long_phone', 'short_phone')
+
+def _is_phone(phone):
+    return phone is not None and len(NON_PHONE_RE.sub('', phone)) >= 10
+
+def _pick_phone(candidates):
+    # Same precedence as the old pattern list: labelled, formatted, bare
+    # digits, then ddd-ddd-dddd, taking the first hit of the first kind that
+    # has at least ten digits
+    for kind in PHONE_KINDS:
+        if _is_phone(candidates.get(kind)):
+            return candidates[kind]
+    return None
+
+def _phone_settled(candidates):
+    # True when no later text can change _pick_phone: the first hit of
+    # every kind ahead of the chosen one is already known
+    for kind in PHONE_KINDS:
+        if kind not in candidates:
+            return False
+        if _is_phone(candidates[kind]):
+            return True
+    return False
+
+def _degree_line_starts(text, start=0):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        matches = DEGREE_RE.finditer(lowered, start)
+    else:
+        # Some characters change length when lowercased; offsets would drift
+        matches = DEGREE_RE_IGNORECASE.finditer(text, start)
+    starts = []
+    for match in matches:
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        if not starts or starts[-1] != line_start:
+            starts.append(line_start)
+    return starts
+
+def scan(text, start=0, find_email=True, find_phone=True):
+    # Scans text from start; what precedes start is only looked at for labels
+    # such as "Phone:", and start must be 0 or just after a line break. With
+    # find_email or find_phone false that search is skipped and nothing is
+    # reported for it.
+    phones = {}
+    # Grades and percentages keep the order the old per-pattern lists produced
+    cgpa = ([], [], [], [])
+    percentages = ([], [], [], [])
+    years = []
+
+    for match in NUMERIC_RE.finditer(text, start):
+        kind = match.lastgroup
+        if kind in PHONE_KINDS and not find_phone:
+            continue
+        if kind == 'phone':
+            if 'labelled_phone' not in phones:
+                label = _label_before(text, match.start())
+                if label and label.group('phone'):
+                    phones['labelled_phone'] = match.group(kind)
+            phones.setdefault(kind, match.group(kind))
+        elif kind in ('long_phone', 'short_phone'):
+            phones.setdefault(kind, match.group(kind))
+        elif kind == 'whole_percent':
+            percentages[1].append(match.group(kind))
+        elif kind == 'years':
+            years.append(int(match.group(kind)))
+        else:
+            value = match.group('decimal')
+            whole = match.group('whole')
+            # The grade patterns only allowed one digit before the point
+            grade = value if len(whole) == 1 else value[1:]
+            label = _label_before(text, match.start())
+            if label and label.group('cgpa') and len(whole) == 1:
+                if label.group('cgpa').lower() == 'cgpa':
+                    cgpa[0].append(value)
+                cgpa[1].append(value)
+            elif label and label.group('percentage'):
+                percentages[2].append(value)
+
+            suffix = (match.group('decimal_suffix') or '').lstrip().lower()
+            if suffix == '%':
+                percentages[0].append(value)
+                # The bare "nn%" pattern also matched the fractional digits
+                percentages[1].append(match.group('fraction'))
+            elif suffix.startswith('cgpa'):
+                cgpa[2].append(grade)
+            elif suffix.startswith('/'):
+                cgpa[3].append(grade)
+            elif suffix.startswith('percent'):
+                percentages[3].append(value)
+            elif suffix:
+                years.append(int(match.group('fraction')))
+
+    degree_lines = []
+    for line_start in _degree_line_starts(text, start):
+        line_end = text.find('\n', line_start)
+        line = text[line_start:] if line_end == -1 else text[line_start:line_end]
+        line_clean = line.strip()
+        if len(line_clean) > 10 and not SKIP_LINE_RE.search(line):
+            if YEAR_RE.search(line) or INSTITUTION_RE.search(line):
+                degree_lines.append(line_clean)
+
+    return Scan(_find_email(text[start:]) if find_email else None, phones, cgpa, percentages, degree_lines, years)
+
+def combine(scans):
+    # The extraction for the text the scans cover, in order. Each kind of
+    # entry is gathered across all of them before precedence applies: the
+    # phone is the first of the highest kind anywhere, and education lists
+    # every CGPA, then every percentage, then the degree lines.
+    email = None
+    phones = {}
+    cgpa = ([], [], [], [])
+    percentages = ([], [], [], [])
+    degree_lines = []
+    years = []
+    for result in scans:
+        email = email or result.email
+        for kind, phone in result.phones.items():
+            phones.setdefault(kind, phone)
+        for group, values in zip(cgpa + percentages, result.cgpa + result.percentages):
+            group.extend(values)
+        degree_lines.extend(result.degree_lines)
+        years.extend(result.experience_years)
+
+    education = [f'CGPA: {value}' for group in cgpa for value in group]
+    for group in percentages:
+        for value in group:
+            percentage = float(value) if value.replace('.', '').isdigit() else 0
+            if 30 <= percentage <= 100:
+                education.append(f'Percentage: {value}%')
+    education.extend(degree_lines)
+    return Extraction(email, _pick_phone(phones), tuple(education), tuple(years))
+
+def safe_end(text):
+    # End of the longest prefix of text that scans the same on its own as
+    # within text plus anything appended later: it ends at a line break that
+    # no match can run across. 0 when there is none yet.
+    end = text.rfind('\n')
+    while end != -1 and (end + 1 == len(text) or text[end + 1] in CONTINUATION_CHARS):
+        end = text.rfind('\n', 0, end)
+    return end + 1
+
+class IncrementalScan:
+    # Scans text fed a page at a time, giving the same extraction as one scan
+    # of the joined pages. Each page is scanned up to its last safe line
+    # break, and the rest waits for the next page; the last LABEL_WINDOW
+    # characters before each piece are kept for its label lookups. Once the
+    # email and phone are settled, later pieces are not searched for them;
+    # the other fields depend on every page.
+    def __init__(self):
+        self.scans = []
+        self._context = ''
+        self._pending = ''
+        self._email = None
+        self._phones = {}
+        self._phone_settled = False
+
+    def feed(self, text):
+        self._pending += text
+        end = safe_end(self._pending)
+        if end:
+            self._scan(self._pending[:end])
+            self._pending = self._pending[end:]
+
+    def _scan(self, piece):
+        result = scan(self._context + piece, len(self._context), find_email=self._email is None, find_phone=not self._phone_settled)
+        self.scans.append(result)
+        self._context = (self._context + piece)[-LABEL_WINDOW:]
+        self._email = self._email or result.email
+        if not self._phone_settled:
+            for kind, phone in result.phones.items():
+                self._phones.setdefault(kind, phone)
+            self._phone_settled = _phone_settled(self._phones)
+
+    def result(self, text):
+        # text is the joined pages
+        if self._pending:
+            self._scan(self._pending)
+            self._pending = ''
+        return merge(text, self.scans)
+
+class ExtractionCache:
+    # Parser and analyzer ask about the same text back to back, so the last
+    # few scans are kept keyed by the text itself
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        with self._lock:
+            result = self._entries.get(text)
+            if result is not None:
+                self._entries.move_to_end(text)
+            return result
+
+    def put(self, text, result):
+        with self._lock:
+            self._entries[text] = result
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+_cache = ExtractionCache()
+
+def extract(text):
+    result = _cache.get(text)
+    if result is None:
+        result = combine([scan(text)])
+        _cache.put(text, result)
+    return result
+
+def merge(text, scans):
+    # Combines the scans of consecutive pieces of text and caches the result
+    # for the whole text, so the analyzer does not rescan it
+    merged = combine(scans)
+    _cache.put(text, merged)
+    return merged
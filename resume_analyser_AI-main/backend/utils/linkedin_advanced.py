@@ -1,42 +1,90 @@
-import requests
+import os
 import re
 from datetime import datetime, timedelta
-from urllib.parse import urlparse
-import json
+from urllib.parse import quote, urlparse
+from utils.profile_fetcher import ProfileFetcher
+
+# Fields a profile source can provide; anything it leaves out is estimated
+PROFILE_FIELDS = ('certificates', 'posts', 'connections', 'profile_completeness')
 
 class AdvancedLinkedInAnalyzer:
-    def __init__(self):
+    def __init__(self, profile_url=None, fetcher=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # URL template of an authorized profile data source returning JSON,
+        # e.g. https://profiles.example.com/in/{profile_id}. Without one the
+        # profile data is simulated and nothing is fetched.
+        self.profile_url = profile_url if profile_url is not None else os.getenv('LINKEDIN_PROFILE_URL')
+        self.fetcher = fetcher or ProfileFetcher(
+            headers=self.headers,
+            max_workers=int(os.getenv('LINKEDIN_FETCH_WORKERS', '8')),
+            rate_limit=float(os.getenv('LINKEDIN_RATE_LIMIT', '5')),
+            cache_ttl=float(os.getenv('LINKEDIN_CACHE_TTL', '3600'))
+        )
     
     def analyze_profile_comprehensive(self, url):
         try:
             # Extract profile data
             profile_data = self._extract_profile_data(url)
             
-            # Analyze certificates
-            certificates = self._analyze_certificates(profile_data)
-            
-            # Analyze activity and updates
-            activity_score = self._analyze_activity(profile_data)
-            
-            # Generate comprehensive analysis
-            analysis = self._generate_comprehensive_analysis(profile_data, certificates, activity_score)
-            
-            return analysis
+            return self._analyze_profile_data(profile_data)
             
         except Exception as e:
             return self._fallback_analysis(url, str(e))
     
-    def _extract_profile_data(self, url):
-        # Since direct scraping is blocked, we'll simulate comprehensive analysis
-        # In real implementation, you'd use LinkedIn API or authorized scraping
+    def analyze_profiles(self, urls):
+        # Analyses in the order of urls. The profiles are fetched
+        # concurrently first, each distinct profile once; a failed fetch gives
+        # its URLs the fallback analysis.
+        profile_ids = [self._extract_profile_id(url) for url in urls]
+        fetched = {}
+        if self.profile_url:
+            keys = [profile_id for profile_id in dict.fromkeys(profile_ids) if profile_id]
+            results = self.fetcher.fetch_many([(profile_id, self._profile_source(profile_id)) for profile_id in keys])
+            fetched = dict(zip(keys, results))
+        
+        analyses = []
+        for url, profile_id in zip(urls, profile_ids):
+            data = fetched.get(profile_id)
+            if isinstance(data, Exception):
+                analyses.append(self._fallback_analysis(url, str(data)))
+                continue
+            try:
+                analyses.append(self._analyze_profile_data(self._extract_profile_data(url, data)))
+            except Exception as e:
+                analyses.append(self._fallback_analysis(url, str(e)))
+        return analyses
+    
+    def _analyze_profile_data(self, profile_data):
+        # Analyze certificates
+        certificates = self._analyze_certificates(profile_data)
+        
+        # Analyze activity and updates
+        activity_score = self._analyze_activity(profile_data)
+        
+        # Generate comprehensive analysis
+        return self._generate_comprehensive_analysis(profile_data, certificates, activity_score)
+    
+    def _profile_source(self, profile_id):
+        return self.profile_url.format(profile_id=quote(profile_id, safe=''))
+    
+    def _fetch_profile(self, profile_id):
+        if not self.profile_url or not profile_id:
+            return None
+        return self.fetcher.fetch(profile_id, self._profile_source(profile_id))
+    
+    def _extract_profile_data(self, url, fetched=None):
+        # Since direct scraping is blocked, profiles come from the configured
+        # source (fetched is its document, when already fetched) and whatever
+        # it does not provide is simulated
         
         profile_id = self._extract_profile_id(url)
+        if fetched is None:
+            fetched = self._fetch_profile(profile_id)
         
         # Simulated comprehensive profile data
-        return {
+        profile_data = {
             'profile_id': profile_id,
             'url': url,
             'is_custom_url': not profile_id.startswith('ACoAA') if profile_id else False,
@@ -46,6 +94,9 @@ class AdvancedLinkedInAnalyzer:
             'connections': self._estimate_connections(url),
             'profile_completeness': self._estimate_completeness(url)
         }
+        if fetched:
+            profile_data.update({field: fetched[field] for field in PROFILE_FIELDS if field in fetched})
+        return profile_data
     
     def _analyze_certificates(self, profile_data):
         certificates = profile_data.get('certificates', [])
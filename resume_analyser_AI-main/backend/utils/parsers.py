@@ -1,109 +1,111 @@
-import PyPDF2
-from docx import Document
-import re
+import io
+import itertools
+import os
+from collections import Counter
+from contextlib import contextmanager
+from utils import docx_text, extraction
+from utils.skill_matcher import default_matcher
 
 class ResumeParser:
-    def extract_text_from_pdf(self, file_path):
-        text = ""
-        with open(file_path, 'rb') as file:
+    # Bump when extraction output changes so cached results are not reused
+    VERSION = 4
+    MAX_EDUCATION_ENTRIES = 5
+
+    def __init__(self, skill_matcher=None):
+        self.skill_matcher = skill_matcher or default_matcher()
+
+    @staticmethod
+    @contextmanager
+    def _binary_stream(source):
+        # Documents may be given as a path, as bytes (or a memoryview), or as
+        # an open binary file such as an upload's spooled stream
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as file:
+                yield file
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            yield io.BytesIO(source)
+        else:
+            source.seek(0)
+            yield source
+
+    @staticmethod
+    def _limit_bytes(chunks, max_bytes):
+        # Passes text chunks through until max_bytes of UTF-8 text have been
+        # produced, cutting the last one short
+        remaining = max_bytes
+        for text in chunks:
+            if remaining is not None:
+                encoded = text.encode('utf-8')
+                if len(encoded) >= remaining:
+                    yield encoded[:remaining].decode('utf-8', 'ignore')
+                    return
+                remaining -= len(encoded)
+            yield text
+
+    def iter_pdf_pages(self, source, max_pages=None, max_bytes=None):
+        # Yields the text of one page at a time, stopping after max_pages pages
+        # or once max_bytes of UTF-8 text have been produced
+        # The PDF library is imported on first use to keep startup fast
+        import PyPDF2
+        with self._binary_stream(source) as file:
             reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text()
-        return text
+            pages = (page.extract_text() or '' for page in itertools.islice(reader.pages, max_pages))
+            yield from self._limit_bytes(pages, max_bytes)
+
+    def extract_text_from_pdf(self, source, max_pages=None, max_bytes=None):
+        return ''.join(self.iter_pdf_pages(source, max_pages, max_bytes))
+
+    def iter_docx_text(self, source, max_bytes=None):
+        # Yields the text as it is streamed out of the document, a block of
+        # lines at a time: headers, the body with its tables and text boxes,
+        # then footers. Stops once max_bytes of UTF-8 text have been produced.
+        with self._binary_stream(source) as file:
+            chunks = (
+                ('\n' if number else '') + '\n'.join(lines)
+                for number, lines in enumerate(docx_text.iter_docx_lines(file))
+            )
+            yield from self._limit_bytes(chunks, max_bytes)
     
-    def extract_text_from_docx(self, file_path):
-        doc = Document(file_path)
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+    def extract_text_from_docx(self, source, max_bytes=None):
+        return ''.join(self.iter_docx_text(source, max_bytes))
     
     def extract_email(self, text):
-        patterns = [
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            r'Email[:\s]*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})'
-        ]
-        
-        for pattern in patterns:
-            emails = re.findall(pattern, text, re.IGNORECASE)
-            if emails:
-                return emails[0] if isinstance(emails[0], str) else emails[0]
-        return None
+        return extraction.extract(text).email
     
     def extract_phone(self, text):
-        patterns = [
-            r'(?:Phone|Mobile|Tel|Contact)[:\s]*([+]?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})',
-            r'([+]?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})',
-            r'([+]?\d{10,15})',
-            r'(\d{3}[\s.-]\d{3}[\s.-]\d{4})'
-        ]
-        
-        for pattern in patterns:
-            phones = re.findall(pattern, text, re.IGNORECASE)
-            if phones:
-                phone = phones[0]
-                clean_phone = re.sub(r'[^\d+]', '', phone)
-                if len(clean_phone) >= 10:
-                    return phone
-        return None
+        return extraction.extract(text).phone
     
     def extract_skills(self, text):
-        common_skills = [
-            'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'SQL', 'MongoDB',
-            'AWS', 'Docker', 'Kubernetes', 'Git', 'HTML', 'CSS', 'Angular',
-            'Vue.js', 'Flask', 'Django', 'Express', 'PostgreSQL', 'MySQL'
-        ]
-        found_skills = []
-        text_lower = text.lower()
-        for skill in common_skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        return found_skills
+        return list(self.skill_matcher.match(text))
     
     def extract_education(self, text):
-        education = []
-        
-        # Extract CGPA/Percentage patterns
-        cgpa_patterns = [
-            r'CGPA[:\s]*([0-9]\.[0-9]{1,2})',
-            r'GPA[:\s]*([0-9]\.[0-9]{1,2})',
-            r'([0-9]\.[0-9]{1,2})[\s]*CGPA',
-            r'([0-9]\.[0-9]{1,2})[\s]*/[\s]*([0-9]\.[0-9]{1,2})'
-        ]
-        
-        percentage_patterns = [
-            r'([0-9]{1,2}\.[0-9]{1,2})%',
-            r'([0-9]{1,2})%',
-            r'Percentage[:\s]*([0-9]{1,2}\.[0-9]{1,2})',
-            r'([0-9]{1,2}\.[0-9]{1,2})[\s]*percent'
-        ]
-        
-        # Find CGPA
-        for pattern in cgpa_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    if isinstance(match, tuple):
-                        education.append(f"CGPA: {match[0]}")
-                    else:
-                        education.append(f"CGPA: {match}")
-        
-        # Find Percentage
-        for pattern in percentage_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    percentage = float(match) if match.replace('.', '').isdigit() else 0
-                    if 30 <= percentage <= 100:
-                        education.append(f"Percentage: {match}%")
-        
-        # Extract degree information
-        degree_keywords = ['bachelor', 'master', 'phd', 'degree', 'diploma', 'b.tech', 'm.tech', 'mba']
-        lines = text.split('\n')
-        
-        for line in lines:
-            line_clean = line.strip()
-            if len(line_clean) > 10 and any(keyword in line.lower() for keyword in degree_keywords):
-                if not any(skip in line.lower() for skip in ['email', 'phone', 'address', 'skill', 'experience', 'work']):
-                    if re.search(r'(19|20)\d{2}', line) or any(word in line.lower() for word in ['university', 'college', 'institute']):
-                        education.append(line_clean)
-        
-        return education[:5] if education else ['Education details not clearly specified']
\ No newline at end of file
+        return self._education_list(extraction.extract(text))
+
+    def _education_list(self, result):
+        return list(result.education[:self.MAX_EDUCATION_ENTRIES]) or ['Education details not clearly specified']
+
+    def parse_pages(self, pages):
+        # Consumes page texts one at a time; the text is scanned once for
+        # email, phone, education and experience years as pages arrive, with
+        # the same result as scanning the joined text, and each page gets one
+        # pass of the skill matcher. Email and phone stop being searched once
+        # settled; every page is still read, as the stored text, skill counts,
+        # experience years and education order depend on all of them.
+        chunks = []
+        scanner = extraction.IncrementalScan()
+        skill_counts = Counter()
+        for page in pages:
+            chunks.append(page)
+            scanner.feed(page)
+            skill_counts.update(self.skill_matcher.match(page))
+
+        text = ''.join(chunks)
+        result = scanner.result(text)
+        return {
+            'text': text,
+            'email': result.email,
+            'phone': result.phone,
+            'skills': list(skill_counts),
+            'skill_counts': dict(skill_counts),
+            'education': self._education_list(result)
+        }
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+class ProfileFetcher:
+    # Fetches JSON profile documents over one pooled HTTP session. At most
+    # max_workers requests run at once, requests to the same host start at
+    # most rate_limit times a second, and responses are cached by key for
+    # cache_ttl seconds (an LRU of max_entries).
+    def __init__(self, headers=None, max_workers=8, rate_limit=5.0, cache_ttl=3600, max_entries=1024, timeout=10):
+        self.headers = headers or {}
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        # key -> (expiry, data)
+        self._cache = OrderedDict()
+        # host -> earliest start of its next request
+        self._next_start = {}
+        self.stats = {'hits': 0, 'misses': 0, 'requests': 0, 'errors': 0}
+
+    @property
+    def session(self):
+        # requests is only imported once something is fetched
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    def cached(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            if entry is not None:
+                del self._cache[key]
+            self.stats['misses'] += 1
+        return None
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _wait_turn(self, host):
+        # Reserves the next start slot for the host, then sleeps until it
+        if not self.rate_limit:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + 1.0 / self.rate_limit
+        if start > now:
+            time.sleep(start - now)
+
+    def fetch(self, key, url):
+        data = self.cached(key)
+        if data is not None:
+            return data
+        with self._slots:
+            self._wait_turn(urlparse(url).netloc)
+            with self._lock:
+                self.stats['requests'] += 1
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+            except Exception:
+                with self._lock:
+                    self.stats['errors'] += 1
+                raise
+        self._remember(key, data)
+        return data
+
+    def fetch_many(self, items):
+        # items is a list of (key, url). Results come back in the same order,
+        # an exception in place of a failed fetch; repeated keys are fetched once.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='profile-fetch')
+        futures = {}
+        for key, url in items:
+            if key not in futures:
+                futures[key] = self._executor.submit(self.fetch, key, url)
+        results = []
+        for key, _ in items:
+            try:
+                results.append(futures[key].result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._cache))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,91 @@
+import json
+import os
+import re
+from collections import Counter
+
+DEFAULT_TAXONOMY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skills.json')
+
+# Words are runs of letters/digits plus the symbols skill names use (C++, C#);
+# a dot joins two words (Node.js, ASP.NET) and a leading dot starts one (.NET).
+# Anything else, including '/', '-' and whitespace, separates words, so
+# "CI/CD" and "scikit-learn" match as two-word phrases.
+WORD_RE = re.compile(r'(?<![\w.])\.?\w[\w+#]*(?:\.\w[\w+#]*)*')
+
+class SkillMatcher:
+    # Aliases from the taxonomy are split into words and stored in a trie keyed
+    # by lowercased word. Matching walks the text's words once, taking the
+    # longest phrase starting at each word, so the cost depends on the text
+    # length and the longest alias, not on how many skills are loaded.
+    def __init__(self, taxonomy):
+        self.version = taxonomy.get('version', 1)
+        self.skills = []
+        self._trie = {}
+        self._max_words = 0
+        for skill in taxonomy.get('skills', []):
+            name = skill['name']
+            self.skills.append(name)
+            # Aliases match in any case; "exact" forms (Go, R, Express) only as
+            # written, for names that are also ordinary words
+            exact = skill.get('exact', [])
+            aliases = list(skill.get('aliases', []))
+            if name not in exact:
+                aliases.append(name)
+            for alias in aliases:
+                self._add(alias, name, None)
+            for alias in exact:
+                self._add(alias, name, alias)
+
+    @classmethod
+    def from_file(cls, path=None):
+        path = path or os.getenv('SKILL_TAXONOMY', DEFAULT_TAXONOMY)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add(self, alias, name, exact):
+        words = WORD_RE.findall(alias)
+        if not words:
+            return
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word.lower(), {})
+        # '' marks the end of a phrase; exact aliases also keep their casing
+        node.setdefault('', []).append((name, tuple(words) if exact else None))
+        self._max_words = max(self._max_words, len(words))
+
+    def _longest_match(self, words, lowered, start):
+        node = self._trie
+        best = None
+        end = start
+        while end < len(words) and end - start < self._max_words:
+            node = node.get(lowered[end])
+            if node is None:
+                break
+            end += 1
+            for name, exact in node.get('', ()):
+                if exact is None or tuple(words[start:end]) == exact:
+                    best = (name, end)
+                    break
+        return best
+
+    def match(self, text):
+        # Returns a Counter of canonical skill names in order of first mention
+        words = WORD_RE.findall(text)
+        lowered = [word.lower() for word in words]
+        counts = Counter()
+        position = 0
+        while position < len(words):
+            found = self._longest_match(words, lowered, position) if lowered[position] in self._trie else None
+            if found:
+                counts[found[0]] += 1
+                position = found[1]
+            else:
+                position += 1
+        return counts
+
+_default_matcher = None
+
+def default_matcher():
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher.from_file()
+    return _default_matcher
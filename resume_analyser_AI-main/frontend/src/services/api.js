@@ -18,6 +18,7 @@ export const analyzeLinkedInUrl = (url) => {
   return api.post('/analyze-linkedin-url', { url });
 };
 
-export const getAnalyses = () => api.get('/analyses');
+export const getAnalyses = ({ limit, cursor, fields } = {}) =>
+  api.get('/analyses', { params: { limit, cursor, fields } });
 
 export const getAnalysis = (id) => api.get(`/analysis/${id}`);
\ No newline at end of file